@@ -1,38 +1,158 @@
 """Management of attribute data and related tasks."""
+import ctypes
+
 import OpenGL.GL as GL
 import numpy as np
 
 
 class Attribute(object):
     """Transfer to the GPU the data required for the rendering process"""
-    def __init__(self, data_type, data):
-        # type of elements in data array: int | float | vec2 | vec3 | vec4
+    # Number of values per vertex and their type in the shader, for each data type
+    FORMAT_DICT = {
+        "int": (1, GL.GL_INT),
+        "float": (1, GL.GL_FLOAT),
+        "vec2": (2, GL.GL_FLOAT),
+        "vec3": (3, GL.GL_FLOAT),
+        "vec4": (4, GL.GL_FLOAT),
+        # read by the shader as four vec4 columns, in consecutive locations
+        "mat4": (16, GL.GL_FLOAT),
+    }
+
+    # Buffer usage hints, by how often the data changes: never | sometimes | every frame
+    USAGE_DICT = {
+        "static": GL.GL_STATIC_DRAW,
+        "dynamic": GL.GL_DYNAMIC_DRAW,
+        "stream": GL.GL_STREAM_DRAW,
+    }
+
+    def __init__(self, data_type, data, upload=True, usage="static", divisor=0):
+        # type of elements in data array: int | float | vec2 | vec3 | vec4 | mat4
         self._data_type = data_type
         # array of data to be stored in buffer
         self._data = data
-        # reference of available buffer from GPU
-        self._buffer_ref = GL.glGenBuffers(1)
-        # Upload data immediately
-        self.upload_data()
+        # how often the data changes: static | dynamic | stream
+        if usage not in Attribute.USAGE_DICT:
+            raise Exception(f'Attribute has unknown usage {usage}')
+        self._usage = usage
+        # number of instances drawn with each value; 0 means one value per vertex
+        self._divisor = divisor
+        # reference of available buffer from GPU;
+        # not needed when the data is stored in an interleaved buffer
+        self._buffer_ref = None
+        # number of bytes allocated for the buffer
+        self._capacity = 0
+        # vertices changed since the last upload, as a range [start, end); None means all
+        self._dirty_range = None
+        # buffer shared with other attributes, if the data is interleaved
+        self._interleaved_buffer = None
+        # position of the first value within each vertex of the shared buffer, in bytes
+        self._offset = 0
+        # Upload data immediately, unless the attribute will be interleaved
+        if upload:
+            self.upload_data()
 
     @property
     def data(self):
         """Exposing data"""
         return self._data
 
-    
+
     @data.setter
     def data(self, data):
         self._data = data
 
+    @property
+    def data_type(self):
+        return self._data_type
+
+    @property
+    def component_count(self):
+        """Number of values per vertex"""
+        if self._data_type not in Attribute.FORMAT_DICT:
+            raise Exception(f'Attribute has unknown type {self._data_type}')
+        return Attribute.FORMAT_DICT[self._data_type][0]
+
+    @property
+    def usage(self):
+        return self._usage
+
+    @property
+    def divisor(self):
+        return self._divisor
+
+    @property
+    def interleaved_buffer(self):
+        return self._interleaved_buffer
+
+    def interleave(self, interleaved_buffer, offset):
+        """ Store the data in a buffer shared with other attributes, starting offset bytes into each vertex """
+        self._interleaved_buffer = interleaved_buffer
+        self._offset = offset
+        # The buffer of this attribute alone is no longer needed
+        if self._buffer_ref is not None:
+            GL.glDeleteBuffers(1, [self._buffer_ref])
+            self._buffer_ref = None
+
+    def delete(self):
+        """ Free the buffer of the attribute on the GPU; an interleaved buffer is freed by its owner """
+        if self._buffer_ref is not None:
+            GL.glDeleteBuffers(1, [self._buffer_ref])
+            self._buffer_ref = None
+        self._capacity = 0
+
+    def mark_dirty(self, start=0, end=None):
+        """
+        Record that the values of vertices start to end (exclusive, by default the last vertex)
+        have changed, so that the next call to upload_data only sends those vertices
+        """
+        if self._interleaved_buffer is not None:
+            self._interleaved_buffer.mark_dirty(start, end)
+            return
+        end = len(self._data) if end is None else end
+        if self._dirty_range is not None:
+            start = min(start, self._dirty_range[0])
+            end = max(end, self._dirty_range[1])
+        self._dirty_range = (start, end)
+
     def upload_data(self):
-        """ Upload the data to a GPU buffer """
-        # Convert data to numpy array format; convert numbers to 32-bit floats
-        data = np.array(self._data).astype(np.float32)
+        """
+        Upload the data to a GPU buffer: the vertices marked as dirty, or all of them.
+        The buffer is only reallocated when the data no longer fits in it.
+        """
+        if self._interleaved_buffer is not None:
+            self._interleaved_buffer.upload_data()
+            return
+        if self._buffer_ref is None:
+            self._buffer_ref = GL.glGenBuffers(1)
+        start, end = self._dirty_range if self._dirty_range is not None else (0, len(self._data))
+        self._dirty_range = None
+        vertex_size = self.component_count * 4
+        size = len(self._data) * vertex_size
+        usage = Attribute.USAGE_DICT[self._usage]
         # Select buffer used by the following functions
         GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._buffer_ref)
-        # Store data in currently bound buffer
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, data.ravel(), GL.GL_STATIC_DRAW)
+        if size > self._capacity:
+            # Allocate a larger buffer and send all the data;
+            # leave room to grow for data that changes
+            self._capacity = size if self._usage == "static" else max(size, 2 * self._capacity)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self._capacity, None, usage)
+            start, end = 0, len(self._data)
+        elif self._usage == "stream" and (start, end) == (0, len(self._data)):
+            # Replace the whole storage instead of waiting for draws still reading the old data
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self._capacity, None, usage)
+        if end > start:
+            data = self.values(start, end)
+            # Store data in the range of the currently bound buffer
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, start * vertex_size, data.nbytes, data.ravel())
+
+    def values(self, start, end):
+        """ Values of vertices start to end (exclusive) as 32-bit floats, one row per vertex, in the layout of the buffer """
+        # Convert data to numpy array format; convert numbers to 32-bit floats
+        data = np.asarray(self._data[start:end], dtype=np.float32)
+        if self._data_type == "mat4":
+            # Matrices are stored column by column
+            data = data.reshape(end - start, 4, 4).transpose(0, 2, 1)
+        return data.reshape(end - start, self.component_count)
 
     def associate_variable(self, program_ref, variable_name):
         """ Associate variable in program with the buffer """
@@ -40,20 +160,27 @@ class Attribute(object):
         variable_ref = GL.glGetAttribLocation(program_ref, variable_name)
         # If the program does not reference the variable, then exit
         if variable_ref != -1:
-            # Select buffer used by the following functions
-            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._buffer_ref)
-            # Specify how data will be read from the currently bound buffer into the specified variable
-            if self._data_type == "int":
-                GL.glVertexAttribPointer(variable_ref, 1, GL.GL_INT, False, 0, None)
-            elif self._data_type == "float":
-                GL.glVertexAttribPointer(variable_ref, 1, GL.GL_FLOAT, False, 0, None)
-            elif self._data_type == "vec2":
-                GL.glVertexAttribPointer(variable_ref, 2, GL.GL_FLOAT, False, 0, None)
-            elif self._data_type == "vec3":
-                GL.glVertexAttribPointer(variable_ref, 3, GL.GL_FLOAT, False, 0, None)
-            elif self._data_type == "vec4":
-                GL.glVertexAttribPointer(variable_ref, 4, GL.GL_FLOAT, False, 0, None)
-            else:
+            if self._data_type not in Attribute.FORMAT_DICT:
                 raise Exception(f'Attribute {variable_name} has unknown type {self._data_type}')
-            # Indicate that data will be streamed to this variable
-            GL.glEnableVertexAttribArray(variable_ref)
+            size, gl_type = Attribute.FORMAT_DICT[self._data_type]
+            # Select buffer used by the following functions;
+            # values of interleaved data are stride bytes apart, starting at the offset
+            if self._interleaved_buffer is not None:
+                GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._interleaved_buffer.buffer_ref)
+                stride = self._interleaved_buffer.stride
+                offset = self._offset
+            else:
+                GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._buffer_ref)
+                stride = size * 4
+                offset = 0
+            # A matrix occupies one location per column
+            location_count = 4 if self._data_type == "mat4" else 1
+            for column in range(location_count):
+                # Specify how data will be read from the currently bound buffer into the specified variable
+                GL.glVertexAttribPointer(variable_ref + column, size // location_count, gl_type, False, stride,
+                                         ctypes.c_void_p(offset + column * size // location_count * 4))
+                # Indicate that data will be streamed to this variable
+                GL.glEnableVertexAttribArray(variable_ref + column)
+                # Advance to the next value once per vertex, or once every divisor instances
+                if self._divisor:
+                    GL.glVertexAttribDivisor(variable_ref + column, self._divisor)
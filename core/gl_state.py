@@ -0,0 +1,150 @@
+"""Shadow copy of the OpenGL state, to skip calls that would not change it."""
+import OpenGL.GL as GL
+
+
+class GLState(object):
+    """
+    Change OpenGL state only when the requested value differs from the current one.
+    Every call of the renderer and the materials that binds objects or changes settings goes through
+    this class, which remembers the values last set; calling OpenGL directly for the same state
+    makes the shadow copy wrong, so call reset() afterwards.
+    Methods that change state return True if OpenGL was called, False if the call was skipped.
+    """
+    # Values last set, indexed by state name (or by state name and texture unit / capability)
+    _state_dict = {}
+    # Number of OpenGL calls made and skipped, indexed by name of OpenGL function
+    _call_count_dict = {}
+    _skipped_count_dict = {}
+
+    @staticmethod
+    def reset():
+        """ Forget all values, so the next call for each piece of state reaches OpenGL """
+        GLState._state_dict.clear()
+
+    @staticmethod
+    def call_count(function_name):
+        """ Number of calls made to an OpenGL function (such as "glBindTexture") through this class """
+        return GLState._call_count_dict.get(function_name, 0)
+
+    @staticmethod
+    def skipped_count(function_name):
+        """ Number of calls to an OpenGL function skipped because they would not change the state """
+        return GLState._skipped_count_dict.get(function_name, 0)
+
+    @staticmethod
+    def _change(key, value, function_name):
+        """ Record a new value for a piece of state; return False if it already had that value """
+        state_dict = GLState._state_dict
+        if key in state_dict and state_dict[key] == value:
+            GLState._skipped_count_dict[function_name] = GLState._skipped_count_dict.get(function_name, 0) + 1
+            return False
+        state_dict[key] = value
+        GLState._call_count_dict[function_name] = GLState._call_count_dict.get(function_name, 0) + 1
+        return True
+
+    @staticmethod
+    def use_program(program_ref):
+        if not GLState._change("program", program_ref, "glUseProgram"):
+            return False
+        GL.glUseProgram(program_ref)
+        return True
+
+    @staticmethod
+    def bind_vertex_array(vao_ref):
+        if not GLState._change("vertexArray", vao_ref, "glBindVertexArray"):
+            return False
+        GL.glBindVertexArray(vao_ref)
+        return True
+
+    @staticmethod
+    def forget_vertex_array(vao_ref):
+        """ Forget a bound vertex array object; needed when it is deleted """
+        if GLState._state_dict.get("vertexArray", None) == vao_ref:
+            del GLState._state_dict["vertexArray"]
+
+    @staticmethod
+    def bind_texture(texture_unit_ref, texture_object_ref):
+        """ Bind a 2D texture to a texture unit (0...15), which becomes the active unit """
+        if GLState._change("activeTexture", texture_unit_ref, "glActiveTexture"):
+            GL.glActiveTexture(GL.GL_TEXTURE0 + texture_unit_ref)
+        if not GLState._change(("texture", texture_unit_ref), texture_object_ref, "glBindTexture"):
+            return False
+        GL.glBindTexture(GL.GL_TEXTURE_2D, texture_object_ref)
+        return True
+
+    @staticmethod
+    def forget_texture(texture_object_ref):
+        """ Forget the units a texture is bound to; needed when the texture is deleted """
+        for key, value in list(GLState._state_dict.items()):
+            if isinstance(key, tuple) and key[0] == "texture" and value == texture_object_ref:
+                del GLState._state_dict[key]
+
+    @staticmethod
+    def bind_framebuffer(framebuffer_ref):
+        if not GLState._change("framebuffer", framebuffer_ref, "glBindFramebuffer"):
+            return False
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, framebuffer_ref)
+        return True
+
+    @staticmethod
+    def viewport(x, y, width, height):
+        if not GLState._change("viewport", (x, y, width, height), "glViewport"):
+            return False
+        GL.glViewport(x, y, width, height)
+        return True
+
+    @staticmethod
+    def clear_color(red, green, blue, alpha):
+        if not GLState._change("clearColor", (red, green, blue, alpha), "glClearColor"):
+            return False
+        GL.glClearColor(red, green, blue, alpha)
+        return True
+
+    @staticmethod
+    def enable(capability):
+        if not GLState._change(("capability", capability), True, "glEnable"):
+            return False
+        GL.glEnable(capability)
+        return True
+
+    @staticmethod
+    def disable(capability):
+        if not GLState._change(("capability", capability), False, "glDisable"):
+            return False
+        GL.glDisable(capability)
+        return True
+
+    @staticmethod
+    def blend_func(source_factor, destination_factor):
+        if not GLState._change("blendFunc", (source_factor, destination_factor), "glBlendFunc"):
+            return False
+        GL.glBlendFunc(source_factor, destination_factor)
+        return True
+
+    @staticmethod
+    def depth_mask(flag):
+        if not GLState._change("depthMask", bool(flag), "glDepthMask"):
+            return False
+        GL.glDepthMask(flag)
+        return True
+
+    @staticmethod
+    def polygon_mode(face, mode):
+        if not GLState._change(("polygonMode", face), mode, "glPolygonMode"):
+            return False
+        GL.glPolygonMode(face, mode)
+        return True
+
+    @staticmethod
+    def line_width(width):
+        if not GLState._change("lineWidth", width, "glLineWidth"):
+            return False
+        GL.glLineWidth(width)
+        return True
+
+    @staticmethod
+    def point_size(size):
+        if not GLState._change("pointSize", size, "glPointSize"):
+            return False
+        GL.glPointSize(size)
+        return True
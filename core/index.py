@@ -0,0 +1,62 @@
+"""Management of vertex index data for indexed rendering."""
+import OpenGL.GL as GL
+import numpy as np
+
+
+class Index(object):
+    """Transfer to the GPU the vertex indices that describe the primitives of a geometry"""
+    def __init__(self, data):
+        # array of vertex indices, read in groups according to the draw style
+        self._data = data
+        # type of the uploaded indices: GL_UNSIGNED_SHORT or GL_UNSIGNED_INT
+        self._gl_type = None
+        # reference of available buffer from GPU
+        self._buffer_ref = GL.glGenBuffers(1)
+        # Upload data immediately
+        self.upload_data()
+
+    @property
+    def data(self):
+        """Exposing data"""
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
+    @property
+    def count(self):
+        """Number of indices"""
+        return len(self._data)
+
+    @property
+    def gl_type(self):
+        return self._gl_type
+
+    @property
+    def buffer_ref(self):
+        return self._buffer_ref
+
+    def upload_data(self):
+        """ Upload the indices to a GPU buffer """
+        data = np.asarray(self._data).ravel()
+        # Use 16-bit indices whenever they can address every vertex
+        if data.size == 0 or data.max() < 2 ** 16:
+            data = data.astype(np.uint16)
+            self._gl_type = GL.GL_UNSIGNED_SHORT
+        else:
+            data = data.astype(np.uint32)
+            self._gl_type = GL.GL_UNSIGNED_INT
+        # Buffers are untyped, so upload through the array buffer target;
+        # binding an element array buffer requires a vertex array object
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._buffer_ref)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, data, GL.GL_STATIC_DRAW)
+
+    def delete(self):
+        """ Free the buffer on the GPU; the object must not be used afterwards """
+        GL.glDeleteBuffers(1, [self._buffer_ref])
+        self._buffer_ref = None
+
+    def bind(self):
+        """ Associate the buffer with the currently bound vertex array object """
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self._buffer_ref)
@@ -0,0 +1,100 @@
+"""Storage of several attributes in a single GPU buffer."""
+import OpenGL.GL as GL
+import numpy as np
+
+from core.attribute import Attribute
+
+
+class InterleavedBuffer(object):
+    """
+    Transfer to the GPU the data of several attributes in one buffer of 32-bit floats,
+    storing all the values of each vertex next to each other
+    """
+    def __init__(self, attribute_list, usage="static"):
+        # attributes stored in this buffer, in the order of their values within a vertex
+        self._attribute_list = list(attribute_list)
+        # how often the data changes: static | dynamic | stream (see Attribute.USAGE_DICT)
+        self._usage = usage
+        # position of the first value of each attribute within a vertex, in bytes
+        self._offset_list = []
+        offset = 0
+        for attribute in self._attribute_list:
+            self._offset_list.append(offset)
+            offset += attribute.component_count * 4
+        # number of bytes between the start of consecutive vertices
+        self._stride = offset
+        # reference of available buffer from GPU
+        self._buffer_ref = GL.glGenBuffers(1)
+        # number of bytes allocated for the buffer
+        self._capacity = 0
+        # vertices changed since the last upload, as a range [start, end); None means all
+        self._dirty_range = None
+        for attribute, offset in zip(self._attribute_list, self._offset_list):
+            attribute.interleave(self, offset)
+        # Upload data immediately
+        self.upload_data()
+
+    @property
+    def attribute_list(self):
+        return self._attribute_list
+
+    @property
+    def buffer_ref(self):
+        return self._buffer_ref
+
+    @property
+    def stride(self):
+        return self._stride
+
+    @property
+    def usage(self):
+        return self._usage
+
+    def delete(self):
+        """ Free the buffer on the GPU; the object must not be used afterwards """
+        GL.glDeleteBuffers(1, [self._buffer_ref])
+        self._buffer_ref = None
+        self._capacity = 0
+
+    def mark_dirty(self, start=0, end=None):
+        """ Record that the values of vertices start to end (exclusive) of some attribute have changed """
+        end = len(self._attribute_list[0].data) if end is None else end
+        if self._dirty_range is not None:
+            start = min(start, self._dirty_range[0])
+            end = max(end, self._dirty_range[1])
+        self._dirty_range = (start, end)
+
+    def upload_data(self):
+        """
+        Pack the current data of every attribute and upload it to the GPU buffer:
+        the vertices marked as dirty, or all of them.
+        The buffer is only reallocated when the data no longer fits in it.
+        """
+        vertex_count = len(self._attribute_list[0].data)
+        for attribute in self._attribute_list:
+            if len(attribute.data) != vertex_count:
+                raise Exception("Interleaved attributes must have the same number of vertices")
+        start, end = self._dirty_range if self._dirty_range is not None else (0, vertex_count)
+        self._dirty_range = None
+        size = vertex_count * self._stride
+        usage = Attribute.USAGE_DICT[self._usage]
+        # Select buffer used by the following functions
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._buffer_ref)
+        if size > self._capacity:
+            # Allocate a larger buffer and send all the data;
+            # leave room to grow for data that changes
+            self._capacity = size if self._usage == "static" else max(size, 2 * self._capacity)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self._capacity, None, usage)
+            start, end = 0, vertex_count
+        elif self._usage == "stream" and (start, end) == (0, vertex_count):
+            # Replace the whole storage instead of waiting for draws still reading the old data
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, self._capacity, None, usage)
+        if end <= start:
+            return
+        # Pack the values of the changed vertices, one row per vertex
+        data = np.empty((end - start, self._stride // 4), dtype=np.float32)
+        for attribute, offset in zip(self._attribute_list, self._offset_list):
+            column = offset // 4
+            data[:, column:column + attribute.component_count] = attribute.values(start, end)
+        # Store data in the range of the currently bound buffer
+        GL.glBufferSubData(GL.GL_ARRAY_BUFFER, start * self._stride, data.nbytes, data.ravel())
@@ -0,0 +1,96 @@
+"""On-disk binary cache for the vertex arrays produced from OBJ files."""
+import json
+import os
+import pathlib
+
+import numpy as np
+
+# File layout: magic, header length (uint32), JSON header, padding, array data
+_MAGIC = b'OBJC'
+# Array data starts on, and every array is padded to, this many bytes
+_ALIGNMENT = 16
+
+
+def _aligned(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def cache_path(source_path, cache_directory=None, variant=None):
+    """
+    Path of the cache file for an OBJ file, in cache_directory or next to the source.
+    Different variants of the data read from the same file are cached separately.
+    """
+    source_path = pathlib.Path(source_path)
+    if cache_directory is None:
+        cache_directory = source_path.parent / "__objcache__"
+    name = source_path.name if variant is None else f"{source_path.name}.{variant}"
+    return pathlib.Path(cache_directory) / (name + ".bin")
+
+
+def read_cache(path, key):
+    """
+    Return the list of groups stored in the cache file at path, as tuples of
+    (name, array, array, ...) whose arrays are read-only views of a memory map.
+    Return None when the file is missing, unreadable or was written for another key.
+    """
+    try:
+        with open(path, 'rb') as cache_file:
+            if cache_file.read(len(_MAGIC)) != _MAGIC:
+                return None
+            header_size = int(np.frombuffer(cache_file.read(4), dtype='<u4')[0])
+            header = json.loads(cache_file.read(header_size).decode('utf-8'))
+    except (OSError, ValueError, IndexError):
+        return None
+    if header.get("key") != key:
+        return None
+    data_offset = _aligned(len(_MAGIC) + 4 + header_size)
+    if os.path.getsize(path) != data_offset + header["data_size"]:
+        # Truncated or partially written file
+        return None
+    if header["data_size"] == 0:
+        buffer = np.zeros(0, dtype=np.uint8)
+    else:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r', offset=data_offset, shape=(header["data_size"],))
+    groups = []
+    for group in header["groups"]:
+        arrays = []
+        for dtype, shape, offset in group["arrays"]:
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            arrays.append(buffer[offset:offset + size].view(dtype).reshape(shape))
+        groups.append((group["name"], *arrays))
+    return groups
+
+
+def write_cache(path, key, groups):
+    """
+    Store groups of (name, array, array, ...) in a cache file tagged with key.
+    The file is written under a temporary name and then moved into place,
+    so readers never see a partially written cache.
+    """
+    path = pathlib.Path(path)
+    arrays = []
+    header_groups = []
+    data_size = 0
+    for name, *group_arrays in groups:
+        entries = []
+        for array in group_arrays:
+            array = np.ascontiguousarray(array)
+            entries.append([array.dtype.str, list(array.shape), data_size])
+            arrays.append((data_size, array))
+            data_size += _aligned(array.nbytes)
+        header_groups.append({"name": name, "arrays": entries})
+    header = json.dumps({"key": key, "data_size": data_size, "groups": header_groups}).encode('utf-8')
+    data_offset = _aligned(len(_MAGIC) + 4 + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary_path, 'wb') as cache_file:
+        cache_file.write(_MAGIC)
+        cache_file.write(np.array([len(header)], dtype='<u4').tobytes())
+        cache_file.write(header)
+        cache_file.write(b'\0' * (data_offset - cache_file.tell()))
+        for offset, array in arrays:
+            cache_file.seek(data_offset + offset)
+            cache_file.write(array.tobytes())
+        cache_file.truncate(data_offset + data_size)
+    os.replace(temporary_path, path)
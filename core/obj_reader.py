@@ -1,45 +1,170 @@
-def my_obj_reader(filename):
-    vertices = []
-    uvs = []
-    normals = []
-    materials = {}
-    current_material = None
-
-    with open(filename, 'r') as in_file:
-        for line in in_file:
-            tokens = line.strip().split()
-            if not tokens:
-                continue
-
-            if tokens[0] == 'v':
-                vertices.append([float(v) for v in tokens[1:]])
-            elif tokens[0] == 'vt':
-                uvs.append([float(v) for v in tokens[1:]])
-            elif tokens[0] == 'vn':
-                normals.append([float(v) for v in tokens[1:]])
-            elif tokens[0] == 'usemtl':
-                current_material = tokens[1]
-                if current_material not in materials:
-                    materials[current_material] = {"positions": [], "uvs": [], "normals": []}
-            elif tokens[0] == 'f':
-                face = [value.split('/') for value in tokens[1:]]
-                for vertex_info in face:
-                    v_idx = int(vertex_info[0]) - 1
-                    t_idx = int(vertex_info[1]) - 1 if len(vertex_info) > 1 and vertex_info[1] else None
-                    n_idx = int(vertex_info[2]) - 1 if len(vertex_info) > 2 and vertex_info[2] else None
-
-                    materials[current_material]["positions"].append(vertices[v_idx])
-                    if t_idx is not None and t_idx < len(uvs):
-                        materials[current_material]["uvs"].append(uvs[t_idx])
-                    else:
-                        materials[current_material]["uvs"].append([0.0, 0.0])
-                    if n_idx is not None and n_idx < len(normals):
-                        materials[current_material]["normals"].append(normals[n_idx])
-                    else:
-                        materials[current_material]["normals"].append([0.0, 0.0, 1.0])  # fallback
-
-    # Return (material_name, positions, uvs, normals)
-    return [
-        (mat_name, mat_data["positions"], mat_data["uvs"], mat_data["normals"])
-        for mat_name, mat_data in materials.items()
-    ]
\ No newline at end of file
+"""Wavefront OBJ loading into per-material NumPy vertex arrays."""
+import hashlib
+
+import numpy as np
+
+from core.obj_cache import cache_path, read_cache, write_cache
+
+# Increase whenever the arrays returned by my_obj_reader change,
+# so that cache files written by older versions are rebuilt
+OBJ_READER_VERSION = 2
+
+# Values used for face corners that do not reference a uv or a normal
+_FALLBACK_UV = [0.0, 0.0]
+_FALLBACK_NORMAL = [0.0, 0.0, 1.0]
+
+
+def _parse_vectors(records, size):
+    """ Convert "x y z ..." records into a (len(records), size) float32 array """
+    if not records:
+        return np.zeros((0, size), dtype=np.float32)
+    values = np.fromstring(' '.join(records), dtype=np.float32, sep=' ')
+    if values.size == len(records) * size:
+        return values.reshape(-1, size)
+    # Records carry optional extra components (vertex colors, the w of a uvw);
+    # keep only the first size components of each one
+    return np.array([record.split()[:size] for record in records], dtype=np.float32)
+
+
+def _parse_face_indices(records):
+    """
+    Convert face records into a (corner_count, 3) int64 array of zero-based
+    position, uv and normal indices; -1 marks a missing uv or normal.
+    Polygons with more than three corners are split into a triangle fan.
+    """
+    joined = ' '.join(records)
+    corners = joined.split()
+    indices = np.zeros((len(corners), 3), dtype=np.int64)
+    fields = corners[0].count('/') + 1
+    if '//' not in joined and fields <= 3 and joined.count('/') == len(corners) * (fields - 1):
+        # Every corner uses the same "v", "v/t" or "v/t/n" layout
+        values = np.fromstring(joined.replace('/', ' '), dtype=np.int64, sep=' ')
+        indices[:, :fields] = values.reshape(-1, fields)
+    else:
+        # Mixed layouts or "v//n" corners: split each corner individually
+        for i, corner in enumerate(corners):
+            for j, value in enumerate(corner.split('/')[:3]):
+                if value:
+                    indices[i, j] = int(value)
+    # OBJ indices start at one; zero marked a missing entry and becomes -1
+    indices -= 1
+    if len(corners) != 3 * len(records):
+        indices = _triangulate(indices, np.array([len(record.split()) for record in records]))
+    return indices
+
+
+def _triangulate(indices, corner_counts):
+    """ Replace polygons of corner_counts corners by the corners of their triangle fans """
+    starts = np.cumsum(corner_counts) - corner_counts
+    triangle_counts = np.maximum(corner_counts - 2, 0)
+    # Each triangle uses the first corner of its polygon and two consecutive others
+    polygon_starts = np.repeat(starts, triangle_counts)
+    offsets = np.arange(triangle_counts.sum()) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts)
+    corner_ids = np.stack((polygon_starts, polygon_starts + offsets + 1, polygon_starts + offsets + 2), axis=1)
+    return indices[corner_ids.ravel()]
+
+
+def _gather(table, index_array, fallback):
+    """ Look up rows of table by index, replacing missing or out of range indices by fallback """
+    # Append the fallback as an extra row addressed by every invalid index
+    table = np.vstack((table, np.array(fallback, dtype=np.float32)))
+    missing = (index_array < 0) | (index_array >= len(table) - 1)
+    return table[np.where(missing, len(table) - 1, index_array)]
+
+
+def _deduplicate(positions, uvs, normals):
+    """
+    Merge vertices with identical position, uv and normal.
+    Return the unique vertices, in order of first use, and a uint32 array
+    with the index of the unique vertex of every original vertex.
+    """
+    vertices = np.ascontiguousarray(np.hstack((positions, uvs, normals)))
+    if len(vertices) == 0:
+        return positions, uvs, normals, np.zeros(0, dtype=np.uint32)
+    # Compare whole rows at once by viewing each one as a single opaque value
+    rows = vertices.view(np.dtype((np.void, vertices.dtype.itemsize * vertices.shape[1]))).ravel()
+    _, first_use, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    # np.unique sorts the rows; renumber them by first use to keep neighbouring
+    # triangles on neighbouring vertices
+    order = np.argsort(first_use)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    unique = vertices[first_use[order]]
+    return unique[:, 0:3], unique[:, 3:5], unique[:, 5:8], new_index[inverse.ravel()].astype(np.uint32)
+
+
+def my_obj_reader(filename, use_cache=True, cache_directory=None, indexed=False):
+    """
+    Read an OBJ file and return a list with one (material_name, positions, uvs, normals)
+    tuple per "usemtl" group, in order of first use. Each array is float32 with one row
+    per triangle corner: positions (n, 3), uvs (n, 2) and normals (n, 3).
+
+    With indexed, corners sharing the same position, uv and normal are merged into
+    one vertex, and each tuple gains a fifth item: a uint32 array with three
+    vertex indices per triangle, for Geometry.set_indices.
+
+    With use_cache, the arrays are stored in a binary cache file (by default in an
+    __objcache__ directory next to the OBJ file) keyed by the file contents and
+    OBJ_READER_VERSION; later calls memory-map that file instead of parsing.
+    Arrays read from the cache are read-only.
+    """
+    with open(filename, 'rb') as in_file:
+        content = in_file.read()
+    if not use_cache:
+        return _parse_obj(content.decode('utf-8'), indexed)
+
+    key = f"{OBJ_READER_VERSION}:{indexed}:{hashlib.sha1(content).hexdigest()}"
+    path = cache_path(filename, cache_directory, "indexed" if indexed else None)
+    groups = read_cache(path, key)
+    if groups is None:
+        # Missing or stale cache: parse the source and rebuild it
+        groups = _parse_obj(content.decode('utf-8'), indexed)
+        try:
+            write_cache(path, key, groups)
+        except OSError as error:
+            # The cache only saves time; loading works without it
+            print(f"Could not write OBJ cache {path}: {error}")
+    return groups
+
+
+def _parse_obj(text, indexed=False):
+    """ Parse the text of an OBJ file into the groups returned by my_obj_reader """
+    lines = text.splitlines()
+
+    # Sort the raw records by type; numbers are only parsed afterwards, in bulk
+    records = {'v': [], 'vt': [], 'vn': []}
+    face_records = {}
+    current_faces = None
+    for line in lines:
+        # Records may be indented and separated by tabs
+        tokens = line.split(None, 1)
+        if not tokens:
+            continue
+        tag = tokens[0]
+        values = tokens[1] if len(tokens) > 1 else ''
+        if tag == 'f':
+            current_faces.append(values)
+        elif tag in records:
+            records[tag].append(values)
+        elif tag == 'usemtl':
+            current_faces = face_records.setdefault(values.strip(), [])
+
+    positions = _parse_vectors(records['v'], 3)
+    uvs = _parse_vectors(records['vt'], 2)
+    normals = _parse_vectors(records['vn'], 3)
+
+    result = []
+    for material_name, faces in face_records.items():
+        if faces:
+            indices = _parse_face_indices(faces)
+        else:
+            indices = np.zeros((0, 3), dtype=np.int64)
+        group = (
+            positions[indices[:, 0]],
+            _gather(uvs, indices[:, 1], _FALLBACK_UV),
+            _gather(normals, indices[:, 2], _FALLBACK_NORMAL),
+        )
+        if indexed:
+            group = _deduplicate(*group)
+        result.append((material_name, *group))
+    return result
@@ -1,15 +1,25 @@
 import OpenGL.GL as GL
+import numpy as np
+
+from core.gl_state import GLState
 
 
 class Uniform:
+    # Last value uploaded to each variable, indexed by (program reference, variable location).
+    # Values are stored in the program, so they persist after draws and program switches,
+    # and are shared by every mesh (and every material) using the same program.
+    _uploaded_value_dict = {}
+
     def __init__(self, data_type, data):
         # type of data:
-        # int | bool | float | vec2 | vec3 | vec4
+        # int | bool | float | vec2 | vec3 | vec4 | int[]
         self._data_type = data_type
         # data to be sent to uniform variable
         self._data = data
         # reference for variable location in program
         self._variable_ref = None
+        # reference of the program containing the variable
+        self._program_ref = None
 
     @property
     def data(self):
@@ -19,8 +29,25 @@ class Uniform:
     def data(self, data):
         self._data = data
 
+    @property
+    def data_type(self):
+        return self._data_type
+
+    @staticmethod
+    def forget_uploaded_values(program_ref=None):
+        """
+        Forget the values uploaded to a program (by default, to every program), so they are
+        uploaded again; needed when a program reference is reused after deleting the program
+        """
+        if program_ref is None:
+            Uniform._uploaded_value_dict.clear()
+        else:
+            for key in [key for key in Uniform._uploaded_value_dict if key[0] == program_ref]:
+                del Uniform._uploaded_value_dict[key]
+
     def locate_variable(self, program_ref, variable_name):
         """ Get and store reference for program variable with given name """
+        self._program_ref = program_ref
         if self._data_type == 'Light':
             self._variable_ref = {
                 "lightType":    GL.glGetUniformLocation(program_ref, variable_name + ".lightType"),
@@ -43,49 +70,81 @@ class Uniform:
         else:
             self._variable_ref = GL.glGetUniformLocation(program_ref, variable_name)
 
+    def _is_uploaded(self, variable_ref, value):
+        """
+        Check whether value is the last one uploaded to the variable; if not, remember it
+        as uploaded, since the caller is about to upload it.
+        Values are compared as numbers, tuples or bytes, which are cheap to compare.
+        """
+        key = (self._program_ref, variable_ref)
+        if key in Uniform._uploaded_value_dict and Uniform._uploaded_value_dict[key] == value:
+            return True
+        Uniform._uploaded_value_dict[key] = value
+        return False
+
     def upload_data(self):
-        """ Store data in uniform variable previously located """
+        """ Store data in uniform variable previously located, unless it already holds that data """
         # If the program does not reference the variable, then exit
         if self._variable_ref != -1:
             if self._data_type == 'int':
-                GL.glUniform1i(self._variable_ref, self._data)
+                if not self._is_uploaded(self._variable_ref, self._data):
+                    GL.glUniform1i(self._variable_ref, self._data)
             elif self._data_type == 'bool':
-                GL.glUniform1i(self._variable_ref, self._data)
+                if not self._is_uploaded(self._variable_ref, self._data):
+                    GL.glUniform1i(self._variable_ref, self._data)
             elif self._data_type == 'float':
-                GL.glUniform1f(self._variable_ref, self._data)
+                if not self._is_uploaded(self._variable_ref, self._data):
+                    GL.glUniform1f(self._variable_ref, self._data)
             elif self._data_type == 'vec2':
-                GL.glUniform2f(self._variable_ref, *self._data)
+                if not self._is_uploaded(self._variable_ref, tuple(self._data)):
+                    GL.glUniform2f(self._variable_ref, *self._data)
             elif self._data_type == 'vec3':
-                GL.glUniform3f(self._variable_ref, *self._data)
+                if not self._is_uploaded(self._variable_ref, tuple(self._data)):
+                    GL.glUniform3f(self._variable_ref, *self._data)
             elif self._data_type == 'vec4':
-                GL.glUniform4f(self._variable_ref, *self._data)
+                if not self._is_uploaded(self._variable_ref, tuple(self._data)):
+                    GL.glUniform4f(self._variable_ref, *self._data)
             elif self._data_type == 'mat4':
-                GL.glUniformMatrix4fv(self._variable_ref, 1, GL.GL_TRUE, self._data)
+                self._upload_matrix(self._variable_ref, self._data)
+            elif self._data_type == 'int[]':
+                # Only the first len(data) elements of the array are set
+                if len(self._data) > 0 and not self._is_uploaded(self._variable_ref, tuple(self._data)):
+                    GL.glUniform1iv(self._variable_ref, len(self._data), np.asarray(self._data, dtype=np.int32))
             elif self._data_type == "sampler2D":
                 texture_object_ref, texture_unit_ref = self._data
-                # Activate texture unit
-                GL.glActiveTexture(GL.GL_TEXTURE0 + texture_unit_ref)
-                # Associate texture object reference to currently active texture unit
-                GL.glBindTexture(GL.GL_TEXTURE_2D, texture_object_ref)
+                # Associate texture object reference to the texture unit
+                GLState.bind_texture(texture_unit_ref, texture_object_ref)
                 # Upload texture unit number (0...15) to uniform variable in shader
-                GL.glUniform1i(self._variable_ref, texture_unit_ref)
+                if not self._is_uploaded(self._variable_ref, texture_unit_ref):
+                    GL.glUniform1i(self._variable_ref, texture_unit_ref)
             elif self._data_type == "Light":
-                GL.glUniform1i(self._variable_ref["lightType"], self._data.light_type)
-                GL.glUniform3f(self._variable_ref["color"], *self._data.color)
-                GL.glUniform3f(self._variable_ref["direction"], *self._data.direction)
-                GL.glUniform3f(self._variable_ref["position"], *self._data.local_position)
-                GL.glUniform3f(self._variable_ref["attenuation"], *self._data.attenuation)
-                GL.glUniform1f(self._variable_ref["cutoff"], self._data.cutoff)
-                GL.glUniform1f(self._variable_ref["innerCutoff"], self._data.inner_cutoff)
+                self._upload_light_field("lightType", GL.glUniform1i, self._data.light_type)
+                self._upload_light_field("color", GL.glUniform3f, *self._data.color)
+                self._upload_light_field("direction", GL.glUniform3f, *self._data.direction)
+                self._upload_light_field("position", GL.glUniform3f, *self._data.local_position)
+                self._upload_light_field("attenuation", GL.glUniform3f, *self._data.attenuation)
+                self._upload_light_field("cutoff", GL.glUniform1f, self._data.cutoff)
+                self._upload_light_field("innerCutoff", GL.glUniform1f, self._data.inner_cutoff)
             elif self._data_type == "Shadow":
-                GL.glUniform3f(self._variable_ref["lightDirection"], *self._data.light_source.direction)
-                GL.glUniformMatrix4fv(self._variable_ref["projectionMatrix"], 1, GL.GL_TRUE, self._data.camera.projection_matrix)
-                GL.glUniformMatrix4fv(self._variable_ref["viewMatrix"], 1, GL.GL_TRUE, self._data.camera.view_matrix)
+                self._upload_light_field("lightDirection", GL.glUniform3f, *self._data.light_source.direction)
+                self._upload_matrix(self._variable_ref["projectionMatrix"], self._data.camera.projection_matrix)
+                self._upload_matrix(self._variable_ref["viewMatrix"], self._data.camera.view_matrix)
                 # Configure depth texture
                 texture_object_ref = self._data.render_target.texture.texture_ref
                 texture_unit_ref = 3
-                GL.glActiveTexture(GL.GL_TEXTURE0 + texture_unit_ref)
-                GL.glBindTexture(GL.GL_TEXTURE_2D, texture_object_ref)
-                GL.glUniform1i(self._variable_ref["depthTextureSampler"], texture_unit_ref)
-                GL.glUniform1f(self._variable_ref["strength"], self._data.strength)
-                GL.glUniform1f(self._variable_ref["bias"], self._data.bias)
+                GLState.bind_texture(texture_unit_ref, texture_object_ref)
+                self._upload_light_field("depthTextureSampler", GL.glUniform1i, texture_unit_ref)
+                self._upload_light_field("strength", GL.glUniform1f, self._data.strength)
+                self._upload_light_field("bias", GL.glUniform1f, self._data.bias)
+
+    def _upload_matrix(self, variable_ref, matrix):
+        """ Upload a 4x4 matrix, compared through the bytes of its 32-bit float values """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if not self._is_uploaded(variable_ref, matrix.tobytes()):
+            GL.glUniformMatrix4fv(variable_ref, 1, GL.GL_TRUE, matrix)
+
+    def _upload_light_field(self, field_name, uniform_function, *values):
+        """ Upload one field of a Light or Shadow struct with the given glUniform function """
+        variable_ref = self._variable_ref[field_name]
+        if not self._is_uploaded(variable_ref, values):
+            uniform_function(variable_ref, *values)
@@ -0,0 +1,53 @@
+"""Uniform values shared by several programs through a uniform buffer object."""
+import OpenGL.GL as GL
+
+
+class UniformBuffer(object):
+    """
+    Store the values of a uniform block in a GPU buffer attached to a binding point;
+    every program whose block is bound to the same point reads these values
+    """
+    def __init__(self, binding_point):
+        # index of the binding point the buffer is attached to
+        self._binding_point = binding_point
+        # reference of available buffer from GPU
+        self._buffer_ref = GL.glGenBuffers(1)
+        # number of bytes allocated for the buffer
+        self._capacity = 0
+        # bytes uploaded last, to skip uploads that change nothing
+        self._data = None
+
+    @property
+    def binding_point(self):
+        return self._binding_point
+
+    @property
+    def buffer_ref(self):
+        return self._buffer_ref
+
+    @staticmethod
+    def bind_program_block(program_ref, block_name, binding_point):
+        """
+        Make a uniform block of a program read its values from the given binding point.
+        Return False if the program has no block with that name.
+        """
+        block_index = GL.glGetUniformBlockIndex(program_ref, block_name)
+        if block_index == GL.GL_INVALID_INDEX:
+            return False
+        GL.glUniformBlockBinding(program_ref, block_index, binding_point)
+        return True
+
+    def upload_data(self, data):
+        """ Upload the values of the block, as bytes laid out with the std140 rules, if they changed """
+        if data == self._data:
+            return
+        self._data = data
+        # Select buffer used by the following functions
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self._buffer_ref)
+        if len(data) > self._capacity:
+            # Allocate a larger buffer and attach it to the binding point
+            self._capacity = len(data)
+            GL.glBufferData(GL.GL_UNIFORM_BUFFER, len(data), data, GL.GL_DYNAMIC_DRAW)
+            GL.glBindBufferBase(GL.GL_UNIFORM_BUFFER, self._binding_point, self._buffer_ref)
+        else:
+            GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, 0, len(data), data)
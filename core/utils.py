@@ -1,21 +1,42 @@
+import hashlib
+import os
+
 import OpenGL.GL as GL
+import numpy as np
 
 from collections import namedtuple
+from OpenGL.error import GLError
 
 
 class Utils:
     """
     Static methods to load and compile OpenGL shaders and link to create programs
     """
+    # Linked programs, indexed by a hash of their shader code; materials with the same shaders
+    # share one program, each keeping its own uniform values
+    _program_dict = {}
+    # Linked program binaries can also be stored on disk, so that later runs can skip compiling.
+    # Disabled unless a directory is set here or in the SOUNDBAR_PROGRAM_CACHE environment variable
+    # (for example ~/.cache/soundbar/programs). The least recently used files are removed above the size limit
+    PROGRAM_CACHE_DIRECTORY = os.environ.get('SOUNDBAR_PROGRAM_CACHE') or None
+    PROGRAM_CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+    # Can programs be saved and restored as binaries? Checked when the first program is created
+    _program_binary_supported = None
+    # Platform description, read from OpenGL when first needed
+    _system_info = None
+
     @staticmethod
     def get_system_info():
-        """Obter informação detalhada sobre a plataforma utilizada"""
+        """Obter informação detalhada sobre a plataforma utilizada (lida uma única vez)"""
+        if Utils._system_info is not None:
+            return Utils._system_info
         vendor = GL.glGetString(GL.GL_VENDOR).decode('utf-8')
         renderer = GL.glGetString(GL.GL_RENDERER).decode('utf-8')
         opengl = GL.glGetString(GL.GL_VERSION).decode('utf-8')
         glsl = GL.glGetString(GL.GL_SHADING_LANGUAGE_VERSION).decode('utf-8')
         Result = namedtuple('SystemInfo', ['vendor', 'renderer', 'opengl', 'glsl'])
-        return Result(vendor, renderer, opengl, glsl)
+        Utils._system_info = Result(vendor, renderer, opengl, glsl)
+        return Utils._system_info
 
     @staticmethod
     def initialize_shader(shader_code, shader_type):
@@ -42,13 +63,129 @@ class Utils:
         # Compilation was successful; return shader reference value
         return shader_ref
 
+    @staticmethod
+    def program_key(vertex_shader_code, fragment_shader_code):
+        """Hash identifying a program by the code of its shaders"""
+        source = vertex_shader_code + '\0' + fragment_shader_code
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
     @staticmethod
     def initialize_program(vertex_shader_code, fragment_shader_code):
+        """Devolve o programa com estes shaders, compilando e linkando apenas na primeira vez"""
+        key = Utils.program_key(vertex_shader_code, fragment_shader_code)
+        if key not in Utils._program_dict:
+            program_ref = None
+            use_binary_cache = Utils.PROGRAM_CACHE_DIRECTORY is not None and Utils.program_binary_supported()
+            if use_binary_cache:
+                # Binaries only work with the driver that created them
+                info = Utils.get_system_info()
+                binary_key = hashlib.sha256((key + info.renderer + info.opengl).encode('utf-8')).hexdigest()
+                program_ref = Utils._load_program_binary(binary_key)
+            if program_ref is None:
+                program_ref = Utils.link_program(vertex_shader_code, fragment_shader_code,
+                                                 retrievable=use_binary_cache)
+                if use_binary_cache:
+                    Utils._save_program_binary(binary_key, program_ref)
+            Utils._program_dict[key] = program_ref
+        return Utils._program_dict[key]
+
+    @staticmethod
+    def program_binary_supported():
+        """Can the driver return programs as binaries and restore them?"""
+        if Utils._program_binary_supported is None:
+            Utils._program_binary_supported = (bool(GL.glGetProgramBinary) and bool(GL.glProgramBinary)
+                                               and GL.glGetIntegerv(GL.GL_NUM_PROGRAM_BINARY_FORMATS) > 0)
+        return Utils._program_binary_supported
+
+    @staticmethod
+    def _load_program_binary(binary_key):
+        """Restore a program stored on disk; None if there is none or the driver rejects it"""
+        path = os.path.join(Utils.PROGRAM_CACHE_DIRECTORY, binary_key + '.bin')
+        try:
+            with open(path, 'rb') as binary_file:
+                data = binary_file.read()
+        except OSError:
+            return None
+        # The first 4 bytes hold the format of the binary
+        binary_format = int.from_bytes(data[:4], 'little')
+        program_ref = GL.glCreateProgram()
+        try:
+            GL.glProgramBinary(program_ref, binary_format, data[4:], len(data) - 4)
+            restored = GL.glGetProgramiv(program_ref, GL.GL_LINK_STATUS)
+        except GLError:
+            restored = False
+        if not restored:
+            # For example, after a driver update; the program is compiled and stored again
+            GL.glDeleteProgram(program_ref)
+            Utils._remove_cache_file(path)
+            return None
+        # Mark the file as recently used, so that it is evicted last
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return program_ref
+
+    @staticmethod
+    def _save_program_binary(binary_key, program_ref):
+        """Store a linked program on disk, then evict the least recently used files above the size limit"""
+        length = GL.glGetProgramiv(program_ref, GL.GL_PROGRAM_BINARY_LENGTH)
+        if length <= 0:
+            return
+        written_length = np.zeros(1, dtype=np.int32)
+        binary_format = np.zeros(1, dtype=np.uint32)
+        binary = np.empty(length, dtype=np.uint8)
+        GL.glGetProgramBinary(program_ref, length, written_length, binary_format, binary)
+        data = int(binary_format[0]).to_bytes(4, 'little') + binary[:written_length[0]].tobytes()
+        path = os.path.join(Utils.PROGRAM_CACHE_DIRECTORY, binary_key + '.bin')
+        try:
+            os.makedirs(Utils.PROGRAM_CACHE_DIRECTORY, exist_ok=True)
+            # Write to a temporary file first, so that another run never reads a partial binary
+            temporary_path = path + '.' + str(os.getpid()) + '.tmp'
+            with open(temporary_path, 'wb') as binary_file:
+                binary_file.write(data)
+            os.replace(temporary_path, path)
+        except OSError:
+            # The cache only saves time; the program works without it
+            return
+        Utils._evict_program_binaries()
+
+    @staticmethod
+    def _evict_program_binaries():
+        """Remove the least recently used binaries until the cache fits in its size limit"""
+        file_list = []
+        try:
+            with os.scandir(Utils.PROGRAM_CACHE_DIRECTORY) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.bin') and entry.is_file():
+                        stat = entry.stat()
+                        file_list.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total_size = sum(size for mtime, size, path in file_list)
+        for mtime, size, path in sorted(file_list):
+            if total_size <= Utils.PROGRAM_CACHE_SIZE_LIMIT:
+                break
+            Utils._remove_cache_file(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove_cache_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def link_program(vertex_shader_code, fragment_shader_code, retrievable=False):
         """Cria o objeto programa e junta os shaders compilados para linkagem"""
         vertex_shader_ref = Utils.initialize_shader(vertex_shader_code, GL.GL_VERTEX_SHADER)
         fragment_shader_ref = Utils.initialize_shader(fragment_shader_code, GL.GL_FRAGMENT_SHADER)
         # Create empty program object and store reference to it
         program_ref = GL.glCreateProgram()
+        if retrievable:
+            # Ask the driver to keep the binary, to store it in the cache
+            GL.glProgramParameteri(program_ref, GL.GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL.GL_TRUE)
         # Attach previously compiled shader programs
         GL.glAttachShader(program_ref, vertex_shader_ref)
         GL.glAttachShader(program_ref, fragment_shader_ref)
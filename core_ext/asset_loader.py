@@ -0,0 +1,146 @@
+"""Parallel loading of OBJ geometry and texture images."""
+import concurrent.futures
+import multiprocessing
+
+import pygame
+
+from core.obj_reader import my_obj_reader
+from core_ext.texture_manager import TextureManager
+
+
+def decode_image(file_name):
+    """
+    Decode an image file into its size, pixel format ("RGB" or "RGBA")
+    and tightly packed pixels, bottom row first, ready for Texture.upload_pixels
+    """
+    surface = pygame.image.load(file_name)
+    # Images without transparency are sent with three bytes per pixel
+    pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA or surface.get_colorkey() else "RGB"
+    return surface.get_size(), pixel_format, pygame.image.tostring(surface, pixel_format, True)
+
+
+class AssetRequest:
+    """ An asset being loaded by an AssetLoader worker """
+    def __init__(self, future, finish, cache_asset=True):
+        # Result of the work done in a worker process
+        self._future = future
+        # Function run on the main thread to turn that result into the asset
+        self._finish = finish
+        # Is the asset kept after the first call to result()? Otherwise finish runs on every call
+        self._cache_asset = cache_asset
+        self._asset = None
+        self._finished = False
+
+    @property
+    def future(self):
+        return self._future
+
+    def done(self):
+        """ True once the worker has finished, so result() will not block """
+        return self._future.done()
+
+    def result(self):
+        """
+        Wait for the worker and return the asset.
+        Must be called from the thread that owns the OpenGL context,
+        since finishing a texture uploads it to the GPU.
+        """
+        if not self._cache_asset:
+            return self._finish(self._future.result())
+        if not self._finished:
+            self._asset = self._finish(self._future.result())
+            self._finished = True
+        return self._asset
+
+
+class AssetLoader:
+    """
+    Parse OBJ files and decode images in a pool of worker processes.
+    Only the upload of the results to the GPU runs on the main thread.
+
+    Scene setup code requests every asset up front, then waits for each one
+    when building the meshes that use it:
+
+        assets = AssetLoader()
+        assets.request_obj("objects/table.obj", indexed=True)
+        assets.request_texture("images/darkwood.jpg")
+        ...
+        geometries = CustomGeometry(1, 1, 1, assets.obj("objects/table.obj", indexed=True))
+        material = LambertMaterial(texture=assets.texture("images/darkwood.jpg"))
+
+    Workers are started with the "spawn" method, which imports the main module
+    again in each worker; scripts using an AssetLoader must therefore start their
+    application under an if __name__ == "__main__": guard.
+    """
+    def __init__(self, max_workers=None):
+        # By default, one worker per CPU core
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        # Requests indexed by asset type, file name and options
+        self._request_dict = {}
+        # Decoded images indexed by file name, shared by textures with different properties
+        self._image_future_dict = {}
+
+    def request_obj(self, file_name, **reader_options):
+        """ Queue the parsing of an OBJ file; reader_options are passed to my_obj_reader """
+        key = ("obj", file_name, tuple(sorted(reader_options.items())))
+        if key not in self._request_dict:
+            future = self._executor.submit(my_obj_reader, file_name, **reader_options)
+            self._request_dict[key] = AssetRequest(future, lambda groups: groups)
+        return self._request_dict[key]
+
+    def request_texture(self, file_name, property_dict=None):
+        """
+        Queue the decoding of an image file, to be uploaded as a Texture.
+        Textures are shared through the TextureManager; images it already
+        holds are not decoded again. Each call to result() of the request
+        acquires one reference to the texture, given back with TextureManager.release.
+        """
+        key = ("texture", file_name, TextureManager.key(file_name, property_dict))
+        if key not in self._request_dict:
+            if TextureManager.contains(file_name, property_dict):
+                future = concurrent.futures.Future()
+                future.set_result(None)
+            else:
+                if file_name not in self._image_future_dict:
+                    self._image_future_dict[file_name] = self._executor.submit(decode_image, file_name)
+                future = self._image_future_dict[file_name]
+            self._request_dict[key] = AssetRequest(
+                future,
+                lambda image: self._acquire_texture(file_name, property_dict, image),
+                cache_asset=False
+            )
+        return self._request_dict[key]
+
+    def obj(self, file_name, **reader_options):
+        """ Wait for an OBJ file (requesting it if necessary) and return its groups """
+        return self.request_obj(file_name, **reader_options).result()
+
+    def texture(self, file_name, property_dict=None):
+        """
+        Wait for an image (requesting it if necessary) and return it as a Texture;
+        every call acquires one reference from the TextureManager, like TextureManager.acquire
+        """
+        return self.request_texture(file_name, property_dict).result()
+
+    @staticmethod
+    def as_completed(request_list):
+        """ Yield the given requests as their workers finish, for example to build meshes in that order """
+        request_dict = {}
+        for request in request_list:
+            request_dict.setdefault(request.future, []).append(request)
+        for future in concurrent.futures.as_completed(request_dict):
+            yield from request_dict[future]
+
+    def shutdown(self):
+        """ Stop the worker processes once every requested asset has been loaded """
+        self._executor.shutdown()
+
+    @staticmethod
+    def _acquire_texture(file_name, property_dict, image):
+        # The texture may have been loaded since the request was made
+        if TextureManager.contains(file_name, property_dict):
+            image = None
+        return TextureManager.acquire(file_name, property_dict, image)
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class Frustum:
+    """
+    The region of space seen through a camera, bounded by six planes
+    (left, right, bottom, top, near, far), used to skip objects that cannot appear on screen
+    """
+    def __init__(self, matrix):
+        # Extract the planes from the projection matrix times the view matrix.
+        # Each plane is stored as (a, b, c, d), with the normal (a, b, c) of length 1
+        # pointing inside, so that a point p is inside when dot(normal, p) + d >= 0
+        matrix = np.asarray(matrix, dtype=float)
+        plane_array = np.array([
+            matrix[3] + matrix[0],
+            matrix[3] - matrix[0],
+            matrix[3] + matrix[1],
+            matrix[3] - matrix[1],
+            matrix[3] + matrix[2],
+            matrix[3] - matrix[2],
+        ])
+        self._plane_array = plane_array / np.linalg.norm(plane_array[:, 0:3], axis=1, keepdims=True)
+
+    @staticmethod
+    def from_camera(camera):
+        """ Frustum of a camera whose view matrix is up to date """
+        return Frustum(camera.projection_matrix @ camera.view_matrix)
+
+    @property
+    def plane_array(self):
+        return self._plane_array
+
+    def intersects_sphere(self, center, radius):
+        """ Return False if the sphere (in world coordinates) lies entirely outside the frustum """
+        distances = self._plane_array[:, 0:3] @ np.asarray(center, dtype=float) + self._plane_array[:, 3]
+        return bool((distances >= -radius).all())
+
+    def intersects_boxes(self, matrix_array, center_array, half_extent_array):
+        """
+        For each box, given by the center and half extents of an axis-aligned box in local coordinates
+        and the matrix transforming it to world coordinates, return False if the box lies entirely
+        outside the frustum. All the boxes are tested at once; the arguments are arrays
+        of shape (n, 4, 4), (n, 3) and (n, 3), and the result is a boolean array of length n.
+        """
+        rotation_array = matrix_array[:, 0:3, 0:3]
+        world_center_array = np.einsum("nij,nj->ni", rotation_array, center_array) + matrix_array[:, 0:3, 3]
+        # Distance from each center to each plane: shape (n, 6)
+        distance_array = world_center_array @ self._plane_array[:, 0:3].T + self._plane_array[:, 3]
+        # Half the size of each transformed box along each plane normal
+        axis_array = np.abs(np.einsum("pi,nij->npj", self._plane_array[:, 0:3], rotation_array))
+        radius_array = np.einsum("npj,nj->np", axis_array, half_extent_array)
+        return (distance_array >= -radius_array).all(axis=1)
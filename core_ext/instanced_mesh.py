@@ -0,0 +1,121 @@
+import numpy as np
+
+from core.attribute import Attribute
+from core_ext.mesh import Mesh
+
+
+class InstancedMesh(Mesh):
+    """
+    Draws the same geometry with the same material several times, with a single draw call.
+    Each instance has its own model matrix, relative to the mesh, and its own color,
+    which multiplies the base color of the material. The material must be created with instanced=True,
+    so that its shaders read them from vertex attributes that advance once per instance.
+    """
+    def __init__(self, geometry, material, matrix_list, color_list=None):
+        if not getattr(material, "instanced", False):
+            raise Exception("InstancedMesh requires a material created with instanced=True")
+        # Attributes with one value per instance, stored in this mesh instead of the shared geometry
+        self._instance_attribute_dict = {
+            "instanceMatrix": Attribute("mat4", [], upload=False, usage="dynamic", divisor=1),
+            "instanceColor": Attribute("vec3", [], upload=False, usage="dynamic", divisor=1),
+        }
+        # The vertex array objects include the instance attributes, so they are not shared with other meshes;
+        # indexed by program reference, and built for one layout version of the geometry
+        self._instance_vao_dict = {}
+        self._instance_vao_layout_version = None
+        # Box containing every instance, computed when first needed,
+        # and the box of the geometry it was computed from
+        self._local_bounding_box = None
+        self._geometry_bounding_box = None
+        # Incremented whenever an instance changes
+        self._instance_version = 0
+        # The instance attributes must be uploaded before the vertex array object is created
+        self.set_instances(matrix_list, color_list)
+        super().__init__(geometry, material)
+
+    @property
+    def instance_count(self):
+        return len(self._instance_attribute_dict["instanceMatrix"].data)
+
+    @property
+    def instance_version(self):
+        return self._instance_version
+
+    @property
+    def matrix_list(self):
+        return self._instance_attribute_dict["instanceMatrix"].data
+
+    @property
+    def color_list(self):
+        return self._instance_attribute_dict["instanceColor"].data
+
+    def set_instances(self, matrix_list, color_list=None):
+        """ Replace all the instances; without colors, every instance is white (the material color is unchanged) """
+        matrix_list = [np.asarray(matrix, dtype=float) for matrix in matrix_list]
+        if color_list is None:
+            color_list = [[1.0, 1.0, 1.0]] * len(matrix_list)
+        elif len(color_list) != len(matrix_list):
+            raise Exception("InstancedMesh needs one color for each instance matrix")
+        self._instance_attribute_dict["instanceMatrix"].data = matrix_list
+        self._instance_attribute_dict["instanceColor"].data = [list(color) for color in color_list]
+        for attribute in self._instance_attribute_dict.values():
+            attribute.upload_data()
+        self._local_bounding_box = None
+        self._instance_version += 1
+
+    def set_instance(self, index, matrix=None, color=None):
+        """ Change the matrix and/or color of one instance, uploading only its values """
+        self._instance_version += 1
+        if matrix is not None:
+            attribute = self._instance_attribute_dict["instanceMatrix"]
+            attribute.data[index] = np.asarray(matrix, dtype=float)
+            attribute.mark_dirty(index, index + 1)
+            attribute.upload_data()
+            self._local_bounding_box = None
+        if color is not None:
+            attribute = self._instance_attribute_dict["instanceColor"]
+            attribute.data[index] = list(color)
+            attribute.mark_dirty(index, index + 1)
+            attribute.upload_data()
+
+    @property
+    def local_bounding_box(self):
+        """ Axis-aligned box containing every instance in the coordinates of the mesh; None if empty """
+        geometry_box = self._geometry.bounding_box
+        # The geometry computes a new box whenever its positions change
+        if geometry_box is not self._geometry_bounding_box:
+            self._local_bounding_box = None
+            self._geometry_bounding_box = geometry_box
+        if self._local_bounding_box is None and self.instance_count > 0:
+            if geometry_box is not None:
+                center, half_extent = geometry_box
+                matrix_array = np.array(self.matrix_list)
+                rotation_array = matrix_array[:, 0:3, 0:3]
+                # Box of each instance, then the box containing all of them
+                center_array = rotation_array @ center + matrix_array[:, 0:3, 3]
+                half_extent_array = np.abs(rotation_array) @ half_extent
+                minimum = (center_array - half_extent_array).min(axis=0)
+                maximum = (center_array + half_extent_array).max(axis=0)
+                self._local_bounding_box = ((minimum + maximum) / 2, (maximum - minimum) / 2)
+        return self._local_bounding_box
+
+    @property
+    def local_bounding_sphere(self):
+        """ Sphere containing every instance in the coordinates of the mesh; None if empty """
+        local_box = self.local_bounding_box
+        if local_box is None:
+            return None
+        center, half_extent = local_box
+        return center, np.linalg.norm(half_extent)
+
+    def _program_vao_dict(self):
+        if self._instance_vao_layout_version != self._geometry.layout_version:
+            if self._instance_vao_dict:
+                Mesh._delete_vertex_arrays(self._instance_vao_dict)
+            self._instance_vao_layout_version = self._geometry.layout_version
+        return self._instance_vao_dict
+
+    def _associate_attributes(self, program_ref):
+        super()._associate_attributes(program_ref)
+        for variable_name, attribute_object in self._instance_attribute_dict.items():
+            attribute_object.associate_variable(program_ref, variable_name)
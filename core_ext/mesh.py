@@ -1,5 +1,9 @@
+import weakref
+
 import OpenGL.GL as GL
+import numpy as np
 
+from core.gl_state import GLState
 from core_ext.object3d import Object3D
 
 
@@ -8,20 +12,69 @@ class Mesh(Object3D):
     Contains geometric data that specifies vertex-related properties and material data
     that specifies the general appearance of the object
     """
+    # Vertex array objects, shared by the meshes that draw the same geometry with the same program;
+    # indexed by geometry, as (layout version of the geometry, dictionary indexed by program reference)
+    _vao_dict = weakref.WeakKeyDictionary()
+
     def __init__(self, geometry, material):
         super().__init__()
         self._geometry = geometry
         self._material = material
         # Should this object be rendered?
         self._visible = True
+        # Does this object never move or change? Static meshes may be merged by a StaticBatcher
+        self._static = False
         # Set up associations between attributes stored in geometry
         # and shader program stored in material
-        self._vao_ref = GL.glGenVertexArrays(1)
-        GL.glBindVertexArray(self._vao_ref)
-        for variable_name, attribute_object in geometry.attribute_dict.items():
-            attribute_object.associate_variable(material.program_ref, variable_name)
-        # Unbind this vertex array object
-        GL.glBindVertexArray(0)
+        self.vertex_array(material)
+
+    def vertex_array(self, material):
+        """ Return the vertex array object associating the attributes of this mesh with the program of a material """
+        program_vao_dict = self._program_vao_dict()
+        if material.program_ref not in program_vao_dict:
+            vao_ref = GL.glGenVertexArrays(1)
+            GLState.bind_vertex_array(vao_ref)
+            self._associate_attributes(material.program_ref)
+            # Unbind this vertex array object
+            GLState.bind_vertex_array(0)
+            program_vao_dict[material.program_ref] = vao_ref
+        return program_vao_dict[material.program_ref]
+
+    def _program_vao_dict(self):
+        """ Vertex array objects this mesh can draw with, indexed by program reference """
+        layout_version, program_vao_dict = Mesh._vao_dict.get(self._geometry, (None, None))
+        if layout_version != self._geometry.layout_version:
+            # The attributes or the index buffer of the geometry changed since these were built
+            if program_vao_dict:
+                Mesh._delete_vertex_arrays(program_vao_dict)
+            program_vao_dict = {}
+            Mesh._vao_dict[self._geometry] = (self._geometry.layout_version, program_vao_dict)
+        return program_vao_dict
+
+    def delete(self):
+        """
+        Free the vertex array objects and the buffers of the geometry on the GPU,
+        for a mesh whose geometry is not drawn by any other mesh; neither may be drawn afterwards
+        """
+        Mesh._delete_vertex_arrays(self._program_vao_dict())
+        self._geometry.delete()
+
+    @staticmethod
+    def _delete_vertex_arrays(program_vao_dict):
+        """ Free the vertex array objects of a dictionary, which is emptied """
+        vao_ref_list = list(program_vao_dict.values())
+        for vao_ref in vao_ref_list:
+            GLState.forget_vertex_array(vao_ref)
+        GL.glDeleteVertexArrays(len(vao_ref_list), vao_ref_list)
+        program_vao_dict.clear()
+
+    def _associate_attributes(self, program_ref):
+        """ Associate the attributes with the variables of a program, in the bound vertex array object """
+        for variable_name, attribute_object in self._geometry.attribute_dict.items():
+            attribute_object.associate_variable(program_ref, variable_name)
+        # The element array binding of an indexed geometry is stored in the vertex array object
+        if self._geometry.index is not None:
+            self._geometry.index.bind()
 
     @property
     def geometry(self):
@@ -30,21 +83,71 @@ class Mesh(Object3D):
     @property
     def material(self):
         return self._material
-    
-    
+
+
     @material.setter
     def material(self, new_material):
         self._material = new_material
-        # If necessary, update any associations between geometry and the new material
-        GL.glBindVertexArray(self._vao_ref)
-        for variable_name, attribute_object in self._geometry.attribute_dict.items():
-            attribute_object.associate_variable(new_material.program_ref, variable_name)
-        GL.glBindVertexArray(0)
+        # If necessary, use the associations between geometry and the new material
+        self.vertex_array(new_material)
 
     @property
     def vao_ref(self):
-        return self._vao_ref
+        """ Vertex array object for the current material, built again if the layout of the geometry changed """
+        return self.vertex_array(self._material)
+
+    @property
+    def local_bounding_box(self):
+        """ Axis-aligned box containing the mesh in local coordinates, as (center, half extents); None if empty """
+        return self._geometry.bounding_box
+
+    @property
+    def local_bounding_sphere(self):
+        """ Sphere containing the mesh in local coordinates, as (center, radius); None if empty """
+        return self._geometry.bounding_sphere
+
+    def bounding_box(self, global_matrix=None):
+        """
+        Axis-aligned box containing the geometry in world coordinates, as (center, half extents);
+        None if the geometry has no positions. The global matrix is computed if not given.
+        """
+        local_box = self.local_bounding_box
+        if local_box is None:
+            return None
+        if global_matrix is None:
+            global_matrix = self.global_matrix
+        center, half_extent = local_box
+        rotation_matrix = global_matrix[0:3, 0:3]
+        return rotation_matrix @ center + global_matrix[0:3, 3], np.abs(rotation_matrix) @ half_extent
+
+    def bounding_sphere(self, global_matrix=None):
+        """
+        Sphere containing the geometry in world coordinates, as (center, radius);
+        None if the geometry has no positions. The global matrix is computed if not given.
+        """
+        local_sphere = self.local_bounding_sphere
+        if local_sphere is None:
+            return None
+        if global_matrix is None:
+            global_matrix = self.global_matrix
+        center, radius = local_sphere
+        rotation_matrix = global_matrix[0:3, 0:3]
+        # The radius grows with the largest scale along any axis
+        scale = np.linalg.norm(rotation_matrix, axis=0).max()
+        return rotation_matrix @ center + global_matrix[0:3, 3], radius * scale
 
     @property
     def visible(self):
         return self._visible
+
+    @visible.setter
+    def visible(self, visible):
+        self._visible = visible
+
+    @property
+    def static(self):
+        return self._static
+
+    @static.setter
+    def static(self, static):
+        self._static = static
@@ -7,8 +7,13 @@ class Object3D:
     def __init__(self):
         # local transform matrix with respect to the parent of the object
         self._matrix = Matrix.make_identity()
+        # transform relative to the root, computed when first needed after a transformation changes
+        self._global_matrix = None
         self._parent = None
         self._children_list = []
+        # Optional TransformStore holding the matrices of this object, and the index of this object in it
+        self._transform_store = None
+        self._transform_index = None
 
     @property
     def children_list(self):
@@ -16,33 +21,91 @@ class Object3D:
 
     @children_list.setter
     def children_list(self, children_list):
+        root = self.root
+        for child in self._children_list:
+            root._unregister_subtree(child)
         self._children_list = children_list
+        for child in children_list:
+            root._register_subtree(child)
+        if self._transform_store is not None:
+            self._transform_store.mark_structure_changed()
+
+    @property
+    def transform_store(self):
+        return self._transform_store
+
+    def _attach(self, transform_store, index, matrix):
+        """ Called by a TransformStore to store this object (the matrix is a view of its array) or to release it """
+        self._transform_store = transform_store
+        self._transform_index = index
+        self._matrix = matrix
+        self._global_matrix = None
 
     @property
     def descendant_list(self):
         """ Return a single list containing all descendants """
         # master list of all descendant nodes
         descendant_list = []
-        # nodes to be added to descendant list,
-        # and whose children will be added to this list
+        # nodes to be added to descendant list, and whose children will be added to this list;
+        # the next node to process is at the end
         nodes_to_process = [self]
         # continue processing nodes while any are left
         while len(nodes_to_process) > 0:
-            # remove first node from list
-            node = nodes_to_process.pop(0)
+            # remove next node from list
+            node = nodes_to_process.pop()
             # add this node to descendant list
             descendant_list.append(node)
-            # children of this node must also be processed
-            nodes_to_process = node._children_list + nodes_to_process
+            # children of this node must be processed next, in order
+            nodes_to_process += node._children_list[::-1]
         return descendant_list
 
+    @property
+    def root(self):
+        """ Return the root of the tree containing this object """
+        node = self
+        while node._parent is not None:
+            node = node._parent
+        return node
+
+    def _register_subtree(self, node):
+        """ Called on the root of a tree when a subtree is attached to it; a Scene keeps track of its objects """
+        pass
+
+    def _unregister_subtree(self, node):
+        """ Called on the root of a tree when a subtree is detached from it """
+        pass
+
     @property
     def global_matrix(self):
-        """ Calculate the transformation of this Object3D relative to the root Object3D of the scene graph """
-        if self._parent is None:
-            return self._matrix
-        else:
-            return self._parent.global_matrix @ self._matrix
+        """
+        Calculate the transformation of this Object3D relative to the root Object3D of the scene graph.
+        The result is kept until this object or one of its ancestors is transformed or moved in the tree.
+        """
+        if self._transform_store is not None:
+            # The store computes the global matrices of all its objects at once
+            global_matrix = self._transform_store.global_matrix(self)
+            if global_matrix is not None:
+                return global_matrix
+        if self._global_matrix is None:
+            if self._parent is None:
+                self._global_matrix = self._matrix
+            else:
+                self._global_matrix = self._parent.global_matrix @ self._matrix
+        return self._global_matrix
+
+    def _mark_dirty(self):
+        """ Forget the global matrices of this object and its descendants, after a transformation changes """
+        # The descendants of a stored object are stored too
+        if self._transform_store is not None:
+            self._transform_store.mark_dirty()
+            return
+        # Global matrices are computed from the root down, so the descendants
+        # of an object without a global matrix have none either
+        if self._global_matrix is None:
+            return
+        self._global_matrix = None
+        for child in self._children_list:
+            child._mark_dirty()
 
     @property
     def global_position(self):
@@ -58,7 +121,14 @@ class Object3D:
     
     @local_matrix.setter
     def local_matrix(self, matrix):
-        self._matrix = matrix
+        if self._transform_store is not None:
+            # Keep the local matrix a view of the array of the store
+            self._matrix[...] = matrix
+        else:
+            # Copy, so that objects given the same matrix (a.local_matrix = b.local_matrix)
+            # do not share it, and set_position on one of them does not move the others behind their caches
+            self._matrix = np.array(matrix, dtype=float)
+        self._mark_dirty()
 
     @property
     def local_position(self):
@@ -75,7 +145,14 @@ class Object3D:
 
     @parent.setter
     def parent(self, parent):
+        # Moving an object into, out of or inside a stored subtree changes the structure of the store
+        for transform_store in {self._transform_store,
+                                getattr(self._parent, "_transform_store", None),
+                                getattr(parent, "_transform_store", None)}:
+            if transform_store is not None:
+                transform_store.mark_structure_changed()
         self._parent = parent
+        self._mark_dirty()
 
     @property
     def rotation_matrix(self):
@@ -97,19 +174,21 @@ class Object3D:
     def add(self, child):
         self._children_list.append(child)
         child.parent = self
+        self.root._register_subtree(child)
 
     def remove(self, child):
         self._children_list.remove(child)
         child.parent = None
+        self.root._unregister_subtree(child)
 
     # apply geometric transformations
     def apply_matrix(self, matrix, local=True):
         if local:
             # local transform
-            self._matrix = self._matrix @ matrix
+            self.local_matrix = self._matrix @ matrix
         else:
             # global transform
-            self._matrix = matrix @ self._matrix
+            self.local_matrix = matrix @ self._matrix
 
     def translate(self, x, y, z, local=True):
         m = Matrix.make_translation(x, y, z)
@@ -136,9 +215,10 @@ class Object3D:
         self._matrix[0, 3] = position[0]
         self._matrix[1, 3] = position[1]
         self._matrix[2, 3] = position[2]
+        self._mark_dirty()
     
     def look_at(self, target_position):
-        self._matrix = Matrix.make_look_at(self.global_position, target_position)
+        self.local_matrix = Matrix.make_look_at(self.global_position, target_position)
 
     def set_direction(self, direction):
         position = self.local_position
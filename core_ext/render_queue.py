@@ -0,0 +1,46 @@
+class RenderQueue:
+    """
+    Meshes to draw in one render pass, each with a sort key, so that they can be drawn in an order
+    that changes as little OpenGL state as possible:
+    opaque meshes grouped by program, textures and vertex array object, then from front to back;
+    transparent meshes after them, from back to front
+    """
+    # Passes, in drawing order
+    OPAQUE = 0
+    TRANSPARENT = 1
+
+    def __init__(self, camera_position):
+        # camera position, to measure the depth of each mesh
+        self._camera_position = camera_position
+        # list of (sort key, mesh, global matrix of the mesh)
+        self._item_list = []
+
+    def __len__(self):
+        return len(self._item_list)
+
+    def __iter__(self):
+        """ Iterate over the (render pass, mesh, global matrix) of each item, in drawing order """
+        for key, mesh, global_matrix in self._item_list:
+            yield key[0], mesh, global_matrix
+
+    def add(self, mesh, global_matrix=None):
+        """ Queue a mesh; its global matrix, if not given, is computed once here and reused when drawing """
+        if global_matrix is None:
+            global_matrix = mesh.global_matrix
+        # Squared distance from the camera
+        depth = ((global_matrix.item((0, 3)) - self._camera_position[0]) ** 2
+                 + (global_matrix.item((1, 3)) - self._camera_position[1]) ** 2
+                 + (global_matrix.item((2, 3)) - self._camera_position[2]) ** 2)
+        material = mesh.material
+        opacity_uniform = material.uniform_dict.get("opacity", None)
+        if opacity_uniform and opacity_uniform.data < 1.0:
+            key = (RenderQueue.TRANSPARENT, -depth)
+        else:
+            # Textures not assigned yet count as texture 0
+            texture_refs = tuple(uniform.data[0] or 0 for uniform in material.uniform_dict.values()
+                                 if uniform.data_type == "sampler2D")
+            key = (RenderQueue.OPAQUE, material.program_ref, texture_refs, mesh.vao_ref, depth)
+        self._item_list.append((key, mesh, global_matrix))
+
+    def sort(self):
+        self._item_list.sort(key=lambda item: item[0])
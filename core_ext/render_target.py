@@ -1,6 +1,7 @@
 import OpenGL.GL as GL
 import pygame
 
+from core.gl_state import GLState
 from core_ext.texture import Texture
 
 
@@ -24,10 +25,11 @@ class RenderTarget:
             )
             self._texture.set_properties(property_dict)
             self._texture.surface = pygame.Surface(resolution)
-            self._texture.upload_data()
+            # Keep an alpha channel, which the surface lacks; effects such as the blurs read it
+            self._texture.upload_data(internal_format=GL.GL_RGBA)
         # Create a framebuffer
         self._framebuffer_ref = GL.glGenFramebuffers(1)
-        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self._framebuffer_ref)
+        GLState.bind_framebuffer(self._framebuffer_ref)
         # Configure color buffer to use this texture
         GL.glFramebufferTexture(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0,
                                 self._texture.texture_ref, 0)
@@ -55,3 +57,12 @@ class RenderTarget:
     @property
     def texture(self):
         return self._texture
+
+    def copy_to(self, render_target):
+        """ Copy the color and depth of this render target into another one of the same size, which stays bound """
+        GLState.bind_framebuffer(render_target.framebuffer_ref)
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self._framebuffer_ref)
+        GL.glBlitFramebuffer(0, 0, self._width, self._height, 0, 0, self._width, self._height,
+                             GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT, GL.GL_NEAREST)
+        # Reading from the bound framebuffer again, as GLState expects
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, render_target.framebuffer_ref)
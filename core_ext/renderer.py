@@ -1,20 +1,48 @@
 import OpenGL.GL as GL
-import pygame
 import numpy as np
+import pygame
 
-from core_ext.mesh import Mesh
+from core.gl_state import GLState
+from core.uniform_buffer import UniformBuffer
+from core_ext.frustum import Frustum
+from core_ext.instanced_mesh import InstancedMesh
+from core_ext.render_queue import RenderQueue
 from light.light import Light
 from light.shadow import Shadow
+from material.lighted import LightedMaterial
 
 
 class Renderer:
+    # Light (one level of an 8-bit color) below which a point light or spotlight is considered to add nothing
+    LIGHT_THRESHOLD = 1 / 256
+
     def __init__(self, clear_color=(0, 0, 0)):
-        GL.glEnable(GL.GL_DEPTH_TEST)
-        GL.glEnable(GL.GL_MULTISAMPLE)  # Antialiasing
+        GLState.enable(GL.GL_DEPTH_TEST)
+        GLState.enable(GL.GL_MULTISAMPLE)  # Antialiasing
         self.clear_color = clear_color
-        GL.glClearColor(*clear_color, 1)
+        GLState.clear_color(*clear_color, 1)
         self._window_size = pygame.display.get_surface().get_size()
         self._shadows_enabled = False
+        # Camera data and lights shared by the programs of lighted materials
+        self._camera_block = UniformBuffer(LightedMaterial.CAMERA_BLOCK_BINDING)
+        self._light_block = UniformBuffer(LightedMaterial.LIGHT_BLOCK_BINDING)
+        # Draw calls and state changes, counted over render calls until reset_statistics()
+        self._statistics = {
+            "draw_calls": 0,
+            "program_switches": 0,
+            "vertex_array_binds": 0,
+            "texture_binds": 0,
+            "meshes_drawn": 0,
+            "meshes_culled": 0,
+            "lights_applied": 0,
+            "lights_culled": 0,
+        }
+        # Skip meshes whose bounding box lies outside the view of the camera?
+        self.frustum_culling = True
+        # Apply to each mesh only the lights that reach its bounding sphere, the strongest first?
+        self.light_culling = True
+        # Has the user been told that the scene has more lights than the light block holds?
+        self._light_overflow_reported = False
 
     @property
     def window_size(self):
@@ -25,38 +53,16 @@ class Renderer:
         return self._shadow_object
 
     def render(self, scene, camera, clear_color=True, clear_depth=True, render_target=None):
-        descendant_list = scene.descendant_list
-        mesh_list = list(filter(lambda x: isinstance(x, Mesh), descendant_list))
-
-        # Shadow pass
-        if self._shadows_enabled:
-            GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self._shadow_object.render_target.framebuffer_ref)
-            GL.glViewport(0, 0, self._shadow_object.render_target.width, self._shadow_object.render_target.height)
-            GL.glClearColor(1, 1, 1, 1)
-            GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
-            GL.glUseProgram(self._shadow_object.material.program_ref)
-            self._shadow_object.update_internal()
-
-            for mesh in mesh_list:
-                if not mesh.visible:
-                    continue
-                if mesh.material.setting_dict["drawStyle"] != GL.GL_TRIANGLES:
-                    continue
-                GL.glBindVertexArray(mesh.vao_ref)
-                self._shadow_object.material.uniform_dict["modelMatrix"].data = mesh.global_matrix
-                for var_name, uniform_obj in self._shadow_object.material.uniform_dict.items():
-                    uniform_obj.upload_data()
-                GL.glDrawArrays(GL.GL_TRIANGLES, 0, mesh.geometry.vertex_count)
-
-            GL.glClearColor(*self.clear_color, 1)
+        # The scene keeps its meshes and lights up to date, so the tree is not traversed
+        mesh_list = scene.mesh_list
+        texture_bind_count = GLState.call_count("glBindTexture")
+
+        # Shadow pass, only needed if a mesh of the scene receives shadows
+        if self._shadows_enabled and self._receives_shadows(mesh_list):
+            self._render_shadow_map(mesh_list)
 
         # Main render pass
-        if render_target is None:
-            GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
-            GL.glViewport(0, 0, *self._window_size)
-        else:
-            GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, render_target.framebuffer_ref)
-            GL.glViewport(0, 0, render_target.width, render_target.height)
+        self._bind_render_target(render_target)
 
         if clear_color:
             GL.glClear(GL.GL_COLOR_BUFFER_BIT)
@@ -64,85 +70,262 @@ class Renderer:
             GL.glClear(GL.GL_DEPTH_BUFFER_BIT)
 
         # Enable blending
-        GL.glEnable(GL.GL_BLEND)
-        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GLState.enable(GL.GL_BLEND)
+        GLState.blend_func(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
 
         camera.update_view_matrix()
-        light_list = list(filter(lambda x: isinstance(x, Light), descendant_list))
+        light_list = scene.light_list
+        if len(light_list) > LightedMaterial.MAX_LIGHT_COUNT and not self._light_overflow_reported:
+            print(f"The light block holds {LightedMaterial.MAX_LIGHT_COUNT} lights; "
+                  f"the last {len(light_list) - LightedMaterial.MAX_LIGHT_COUNT} lights of the scene are ignored")
+            self._light_overflow_reported = True
+        # Upload the data shared by lighted materials once, instead of once per mesh
+        self._camera_block.upload_data(LightedMaterial.camera_block_data(camera))
+        self._light_block.upload_data(LightedMaterial.light_block_data(light_list))
+        light_range = self._light_range(light_list[:LightedMaterial.MAX_LIGHT_COUNT])
 
-        # Separate opaque and transparent meshes
-        opaque_meshes = []
-        transparent_meshes = []
-        for mesh in mesh_list:
-            opacity_uniform = mesh.material.uniform_dict.get("opacity", None)
-            if opacity_uniform and opacity_uniform.data < 1.0:
-                transparent_meshes.append(mesh)
-            else:
-                opaque_meshes.append(mesh)
+        # Skip the meshes outside the view of the camera
+        visible_mesh_list = [mesh for mesh in mesh_list if mesh.visible]
+        global_matrix_list = [mesh.global_matrix for mesh in visible_mesh_list]
+        if self.frustum_culling:
+            in_view_list = self._in_view(camera, visible_mesh_list, global_matrix_list)
+        else:
+            in_view_list = [True] * len(visible_mesh_list)
 
-        # --- Render opaque meshes ---
-        for mesh in opaque_meshes:
-            if not mesh.visible:
-                continue
-            GL.glUseProgram(mesh.material.program_ref)
-            GL.glBindVertexArray(mesh.vao_ref)
-
-            mesh.material.uniform_dict["modelMatrix"].data = mesh.global_matrix
-            mesh.material.uniform_dict["viewMatrix"].data = camera.view_matrix
-            mesh.material.uniform_dict["projectionMatrix"].data = camera.projection_matrix
-
-            if "viewPosition" in mesh.material.uniform_dict:
-                mesh.material.uniform_dict["viewPosition"].data = camera.global_position
-            if self._shadows_enabled and "shadow0" in mesh.material.uniform_dict:
-                mesh.material.uniform_dict["shadow0"].data = self._shadow_object
-            if "light0" in mesh.material.uniform_dict:
+        # Queue the meshes in view: opaque meshes grouped by program, textures and
+        # vertex array object, then transparent meshes from back to front
+        render_queue = RenderQueue(camera.global_position)
+        for mesh, global_matrix, in_view in zip(visible_mesh_list, global_matrix_list, in_view_list):
+            if in_view:
+                render_queue.add(mesh, global_matrix)
+        render_queue.sort()
+        self._statistics["meshes_drawn"] += len(render_queue)
+        self._statistics["meshes_culled"] += len(visible_mesh_list) - len(render_queue)
+
+        for render_pass, mesh, global_matrix in render_queue:
+            if render_pass == RenderQueue.TRANSPARENT:
+                GLState.depth_mask(GL.GL_FALSE)  # Disable writing to depth buffer
+            material = mesh.material
+            if GLState.use_program(material.program_ref):
+                self._statistics["program_switches"] += 1
+            if GLState.bind_vertex_array(mesh.vao_ref):
+                self._statistics["vertex_array_binds"] += 1
+
+            material.uniform_dict["modelMatrix"].data = global_matrix
+            # Lighted materials read the camera data from the camera block instead
+            if "viewMatrix" in material.uniform_dict:
+                material.uniform_dict["viewMatrix"].data = camera.view_matrix
+                material.uniform_dict["projectionMatrix"].data = camera.projection_matrix
+
+            if "viewPosition" in material.uniform_dict:
+                material.uniform_dict["viewPosition"].data = camera.global_position
+            if self._shadows_enabled and "shadow0" in material.uniform_dict:
+                material.uniform_dict["shadow0"].data = self._shadow_object
+            if "lightCount" in material.uniform_dict:
+                # Only the lights of the light block that reach the mesh
+                light_index_list = self._mesh_light_index_list(mesh, global_matrix, light_range,
+                                                               material.number_of_light_sources)
+                material.set_lights(light_index_list)
+                self._statistics["lights_applied"] += len(light_index_list)
+                self._statistics["lights_culled"] += len(light_range[0]) - len(light_index_list)
+            if "light0" in material.uniform_dict:
                 for i, light in enumerate(light_list):
                     key = f"light{i}"
-                    if key in mesh.material.uniform_dict:
-                        mesh.material.uniform_dict[key].data = light
+                    if key in material.uniform_dict:
+                        material.uniform_dict[key].data = light
 
-            for uniform in mesh.material.uniform_dict.values():
+            for uniform in material.uniform_dict.values():
                 uniform.upload_data()
 
-            mesh.material.update_render_settings()
-            GL.glDrawArrays(mesh.material.setting_dict["drawStyle"], 0, mesh.geometry.vertex_count)
+            material.update_render_settings()
+            self._draw(mesh, material.setting_dict["drawStyle"])
 
-        # --- Render transparent meshes ---
-        transparent_meshes.sort(
-            key=lambda m: np.sum((np.array(m.global_position) - np.array(camera.global_position)) ** 2),
-            reverse=True
-        )
+        GLState.depth_mask(GL.GL_TRUE)  # Re-enable writing to depth buffer
+        self._statistics["texture_binds"] += GLState.call_count("glBindTexture") - texture_bind_count
 
-        GL.glDepthMask(GL.GL_FALSE)  # Disable writing to depth buffer
+    def render_fullscreen(self, mesh, render_target=None):
+        """
+        Draw a mesh whose vertices are already in clip space, such as the rectangle of a postprocessing effect:
+        bind the target, the program, the input textures and the vertex array object, then issue one draw call.
+        Unlike render(), there is no scene, camera, light or shadow pass.
+        """
+        texture_bind_count = GLState.call_count("glBindTexture")
+        self._bind_render_target(render_target)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        GLState.enable(GL.GL_BLEND)
+        GLState.blend_func(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GLState.depth_mask(GL.GL_TRUE)
 
-        for mesh in transparent_meshes:
-            if not mesh.visible:
-                continue
-            GL.glUseProgram(mesh.material.program_ref)
-            GL.glBindVertexArray(mesh.vao_ref)
-
-            mesh.material.uniform_dict["modelMatrix"].data = mesh.global_matrix
-            mesh.material.uniform_dict["viewMatrix"].data = camera.view_matrix
-            mesh.material.uniform_dict["projectionMatrix"].data = camera.projection_matrix
-
-            if "viewPosition" in mesh.material.uniform_dict:
-                mesh.material.uniform_dict["viewPosition"].data = camera.global_position
-            if self._shadows_enabled and "shadow0" in mesh.material.uniform_dict:
-                mesh.material.uniform_dict["shadow0"].data = self._shadow_object
-            if "light0" in mesh.material.uniform_dict:
-                for i, light in enumerate(light_list):
-                    key = f"light{i}"
-                    if key in mesh.material.uniform_dict:
-                        mesh.material.uniform_dict[key].data = light
+        material = mesh.material
+        if GLState.use_program(material.program_ref):
+            self._statistics["program_switches"] += 1
+        if GLState.bind_vertex_array(mesh.vao_ref):
+            self._statistics["vertex_array_binds"] += 1
+        for uniform in material.uniform_dict.values():
+            uniform.upload_data()
+        material.update_render_settings()
+        self._draw(mesh, material.setting_dict["drawStyle"])
+        self._statistics["texture_binds"] += GLState.call_count("glBindTexture") - texture_bind_count
 
-            for uniform in mesh.material.uniform_dict.values():
-                uniform.upload_data()
+    @property
+    def statistics(self):
+        """
+        Number of draw calls, program switches, vertex array object binds and texture binds
+        made since the last call to reset_statistics(), of meshes drawn and culled
+        in the main render pass, and of lights applied to and culled from those meshes, indexed by name
+        """
+        return self._statistics
+
+    def reset_statistics(self):
+        """ Start counting draw calls and state changes again, for example at the start of each frame """
+        for name in self._statistics:
+            self._statistics[name] = 0
+
+    def _render_shadow_map(self, mesh_list):
+        """ Render the depth of the casters seen from the shadow light, unless the light and casters did not change """
+        shadow = self._shadow_object
+        shadow.update_internal()
+        caster_list = [mesh for mesh in mesh_list
+                       if mesh.visible and mesh.material.setting_dict["drawStyle"] == GL.GL_TRIANGLES]
+        if not shadow.update_casters(caster_list):
+            return
+        if shadow.split_casters:
+            # Casters that never moved are only drawn when they change, into their own render target
+            if shadow.static_changed:
+                self._draw_shadow_casters(shadow.static_render_target, shadow.static_caster_list)
+            shadow.static_render_target.copy_to(shadow.render_target)
+            self._draw_shadow_casters(shadow.render_target, shadow.dynamic_caster_list, clear=False)
+        else:
+            self._draw_shadow_casters(shadow.render_target, caster_list)
+        GLState.clear_color(*self.clear_color, 1)
+
+    def _draw_shadow_casters(self, render_target, caster_list, clear=True):
+        """ Draw the depth of meshes into a render target, seen from the shadow light """
+        GLState.bind_framebuffer(render_target.framebuffer_ref)
+        GLState.viewport(0, 0, render_target.width, render_target.height)
+        if clear:
+            GLState.clear_color(1, 1, 1, 1)
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        # Instanced meshes need the instanced depth material
+        shadow_list = []
+        for mesh in caster_list:
+            if isinstance(mesh, InstancedMesh):
+                depth_material = self._shadow_object.instanced_material
+            else:
+                depth_material = self._shadow_object.material
+            shadow_list.append((depth_material.program_ref, mesh.vertex_array(depth_material), depth_material, mesh))
+        # Meshes sharing a program and a vertex array object are drawn one after another
+        shadow_list.sort(key=lambda item: item[0:2])
+        for program_ref, vao_ref, depth_material, mesh in shadow_list:
+            if GLState.use_program(program_ref):
+                self._statistics["program_switches"] += 1
+            if GLState.bind_vertex_array(vao_ref):
+                self._statistics["vertex_array_binds"] += 1
+            depth_material.uniform_dict["modelMatrix"].data = mesh.global_matrix
+            for uniform_obj in depth_material.uniform_dict.values():
+                uniform_obj.upload_data()
+            self._draw(mesh, GL.GL_TRIANGLES)
+
+    def _bind_render_target(self, render_target):
+        """ Draw into a render target, or into the window if None """
+        if render_target is None:
+            GLState.bind_framebuffer(0)
+            GLState.viewport(0, 0, *self._window_size)
+        else:
+            GLState.bind_framebuffer(render_target.framebuffer_ref)
+            GLState.viewport(0, 0, render_target.width, render_target.height)
+
+    @staticmethod
+    def _receives_shadows(mesh_list):
+        """ Does a visible mesh have a material that reads the shadow map? """
+        for mesh in mesh_list:
+            if mesh.visible and "shadow0" in mesh.material.uniform_dict:
+                return True
+        return False
 
-            mesh.material.update_render_settings()
-            GL.glDrawArrays(mesh.material.setting_dict["drawStyle"], 0, mesh.geometry.vertex_count)
+    @staticmethod
+    def _in_view(camera, mesh_list, global_matrix_list):
+        """ For each mesh, False if its bounding box lies outside the view of the camera """
+        in_view_array = np.ones(len(mesh_list), dtype=bool)
+        # Meshes without vertex positions are always drawn
+        index_list = [i for i, mesh in enumerate(mesh_list) if mesh.local_bounding_box is not None]
+        if index_list:
+            box_list = [mesh_list[i].local_bounding_box for i in index_list]
+            in_view_array[index_list] = Frustum.from_camera(camera).intersects_boxes(
+                np.array([global_matrix_list[i] for i in index_list], dtype=float),
+                np.array([center for center, half_extent in box_list]),
+                np.array([half_extent for center, half_extent in box_list])
+            )
+        return in_view_array
 
-        GL.glDepthMask(GL.GL_TRUE)  # Re-enable writing to depth buffer
+    @staticmethod
+    def _light_range(light_list):
+        """
+        Positions, attenuations and strengths (largest color component) of the lights, as arrays,
+        and the distance beyond which each light adds less than LIGHT_THRESHOLD;
+        infinite for lights that do not fade with distance
+        """
+        position_array = np.array([light.local_position for light in light_list], dtype=float).reshape(-1, 3)
+        attenuation_array = np.array([light.attenuation for light in light_list], dtype=float).reshape(-1, 3)
+        strength_array = np.array([max(light.color) for light in light_list], dtype=float)
+        radius_array = np.full(len(light_list), np.inf)
+        for i, light in enumerate(light_list):
+            constant, linear, quadratic = attenuation_array[i]
+            if light.light_type not in (Light.POINT, Light.SPOT) or (linear <= 0 and quadratic <= 0):
+                continue
+            # Solve constant + linear * d + quadratic * d^2 = strength / LIGHT_THRESHOLD
+            target = strength_array[i] / Renderer.LIGHT_THRESHOLD
+            if target <= constant:
+                radius_array[i] = 0.0
+            elif quadratic > 0:
+                radius_array[i] = (-linear + np.sqrt(linear ** 2 + 4 * quadratic * (target - constant))) / (2 * quadratic)
+            else:
+                radius_array[i] = (target - constant) / linear
+        return position_array, attenuation_array, strength_array, radius_array
+
+    def _mesh_light_index_list(self, mesh, global_matrix, light_range, count):
+        """
+        Indices in the light block of the lights applied to a mesh: those reaching its bounding sphere,
+        or the count with the largest contribution if there are more, kept in the order of the block
+        """
+        position_array, attenuation_array, strength_array, radius_array = light_range
+        sphere = mesh.bounding_sphere(global_matrix) if self.light_culling else None
+        # Without bounds, the first lights of the block are applied
+        if sphere is None:
+            return list(range(min(len(radius_array), count)))
+        center, radius = sphere
+        # Distance from each light to the closest point of the sphere
+        distance_array = np.maximum(np.linalg.norm(position_array - center, axis=1) - radius, 0.0)
+        index_array = np.flatnonzero(distance_array < radius_array)
+        if len(index_array) > count:
+            # Lights that do not fade with distance come first
+            attenuation_array = attenuation_array[index_array]
+            distance_array = distance_array[index_array]
+            contribution_array = np.where(
+                np.isinf(radius_array[index_array]), np.inf,
+                strength_array[index_array] / (attenuation_array[:, 0] + attenuation_array[:, 1] * distance_array
+                                               + attenuation_array[:, 2] * distance_array ** 2)
+            )
+            index_array = np.sort(index_array[np.argsort(-contribution_array, kind="stable")[:count]])
+        return index_array.tolist()
+
+    def _draw(self, mesh, draw_style):
+        """ Issue the draw call of a mesh whose program and vertex array object are bound """
+        self._statistics["draw_calls"] += 1
+        geometry = mesh.geometry
+        if isinstance(mesh, InstancedMesh):
+            # Draw every instance at once
+            if geometry.index is not None:
+                GL.glDrawElementsInstanced(draw_style, geometry.index.count, geometry.index.gl_type, None,
+                                           mesh.instance_count)
+            else:
+                GL.glDrawArraysInstanced(draw_style, 0, geometry.vertex_count, mesh.instance_count)
+        elif geometry.index is not None:
+            GL.glDrawElements(draw_style, geometry.index.count, geometry.index.gl_type, None)
+        else:
+            GL.glDrawArrays(draw_style, 0, geometry.vertex_count)
 
-    def enable_shadows(self, shadow_light, strength=0.5, resolution=(512, 512)):
+    def enable_shadows(self, shadow_light, strength=0.5, resolution=(512, 512), split_casters=True):
         self._shadows_enabled = True
-        self._shadow_object = Shadow(shadow_light, strength=strength, resolution=resolution)
+        self._shadow_object = Shadow(shadow_light, strength=strength, resolution=resolution,
+                                     split_casters=split_casters)
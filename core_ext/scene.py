@@ -1,4 +1,7 @@
+from core_ext.camera import Camera
+from core_ext.mesh import Mesh
 from core_ext.object3d import Object3D
+from light.light import Light
 
 
 class Scene(Object3D):
@@ -6,3 +9,43 @@ class Scene(Object3D):
 
     def __init__(self):
         super().__init__()
+        # Meshes, lights and cameras in the tree, kept up to date as objects are added and removed,
+        # so that they can be read every frame without traversing the tree;
+        # dictionaries keep the order in which the objects were added
+        self._mesh_dict = {}
+        self._light_dict = {}
+        self._camera_dict = {}
+
+    @property
+    def mesh_list(self):
+        return list(self._mesh_dict)
+
+    @property
+    def light_list(self):
+        return list(self._light_dict)
+
+    @property
+    def camera_list(self):
+        return list(self._camera_dict)
+
+    def _register_subtree(self, node):
+        for descendant in node.descendant_list:
+            registry_dict = self._registry_dict(descendant)
+            if registry_dict is not None:
+                registry_dict[descendant] = None
+
+    def _unregister_subtree(self, node):
+        for descendant in node.descendant_list:
+            registry_dict = self._registry_dict(descendant)
+            if registry_dict is not None:
+                registry_dict.pop(descendant, None)
+
+    def _registry_dict(self, node):
+        """ Dictionary in which an object of the tree is registered; None for other objects """
+        if isinstance(node, Mesh):
+            return self._mesh_dict
+        if isinstance(node, Light):
+            return self._light_dict
+        if isinstance(node, Camera):
+            return self._camera_dict
+        return None
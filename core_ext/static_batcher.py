@@ -0,0 +1,141 @@
+import OpenGL.GL as GL
+import numpy as np
+from numpy.linalg import inv
+
+from core_ext.instanced_mesh import InstancedMesh
+from core_ext.mesh import Mesh
+from geometry.geometry import Geometry
+
+
+class StaticBatcher:
+    """
+    Replace the static meshes of a subtree that share a material by a single merged mesh,
+    whose vertices already include the transformations of the original meshes,
+    so that they are drawn with one draw call.
+    The original meshes are hidden but stay in the scene graph (for picking, for example);
+    moving one of them requires undoing its batch with unbatch(mesh) first.
+    """
+    # Attributes transformed as points and as directions when the vertices are baked
+    POSITION_NAME_LIST = ["vertexPosition"]
+    NORMAL_NAME_LIST = ["vertexNormal", "faceNormal"]
+
+    def __init__(self, root):
+        # root of the subtree; the merged meshes are added to it
+        self._root = root
+        # list of (merged mesh, list of the original meshes merged into it)
+        self._batch_list = []
+        # The batch of each merged original mesh, indexed by mesh
+        self._batch_dict = {}
+
+    @property
+    def batch_list(self):
+        return self._batch_list
+
+    def batch(self):
+        """
+        Merge the visible static meshes of the subtree that are not batched yet,
+        one merged mesh per material; return the number of merged meshes created
+        """
+        # Meshes that can be merged together, indexed by material and vertex layout
+        group_dict = {}
+        for node in self._root.descendant_list:
+            if not isinstance(node, Mesh) or isinstance(node, InstancedMesh):
+                continue
+            if not node.static or not node.visible or node in self._batch_dict:
+                continue
+            key = self._group_key(node)
+            if key is not None:
+                group_dict.setdefault(key, []).append(node)
+        # Vertices are baked in the coordinates of the root, where the merged meshes are placed
+        root_inverse_matrix = inv(self._root.global_matrix)
+        batch_count = 0
+        for mesh_list in group_dict.values():
+            # A single mesh gains nothing from being merged
+            if len(mesh_list) < 2:
+                continue
+            merged_mesh = Mesh(self._merge_geometry(mesh_list, root_inverse_matrix), mesh_list[0].material)
+            self._root.add(merged_mesh)
+            batch = (merged_mesh, mesh_list)
+            for mesh in mesh_list:
+                mesh.visible = False
+                self._batch_dict[mesh] = batch
+            self._batch_list.append(batch)
+            batch_count += 1
+        return batch_count
+
+    def unbatch(self, mesh=None):
+        """
+        Remove the merged meshes and show the original meshes again.
+        Given a mesh, only undo the batch containing it and flag the mesh as not static,
+        so that it can move; the other meshes of that batch are merged again.
+        A mesh that is not merged is left unchanged.
+        """
+        if mesh is None:
+            batch_list = list(self._batch_list)
+        elif mesh in self._batch_dict:
+            batch_list = [self._batch_dict[mesh]]
+        else:
+            # The mesh was never merged, so there is nothing to undo
+            return
+        for batch in batch_list:
+            merged_mesh, mesh_list = batch
+            merged_mesh.parent.remove(merged_mesh)
+            # The merged geometry belongs to this batch only
+            merged_mesh.delete()
+            for original_mesh in mesh_list:
+                original_mesh.visible = True
+                del self._batch_dict[original_mesh]
+            self._batch_list.remove(batch)
+        if mesh is not None:
+            mesh.static = False
+            self.batch()
+
+    @staticmethod
+    def _group_key(mesh):
+        """ Key shared by the meshes that can be merged together; None if the mesh cannot be merged """
+        geometry = mesh.geometry
+        material = mesh.material
+        position_attribute = geometry.attribute_dict.get("vertexPosition", None)
+        if position_attribute is None or position_attribute.data_type != "vec3":
+            return None
+        # Strips and loops cannot be joined into a single primitive
+        if material.setting_dict["drawStyle"] != GL.GL_TRIANGLES:
+            return None
+        # Transparent meshes are sorted one by one, from back to front
+        opacity_uniform = material.uniform_dict.get("opacity", None)
+        if opacity_uniform and opacity_uniform.data < 1.0:
+            return None
+        layout = tuple(sorted((name, attribute.data_type) for name, attribute in geometry.attribute_dict.items()))
+        return material, layout, geometry.index is not None
+
+    @staticmethod
+    def _merge_geometry(mesh_list, root_inverse_matrix):
+        """ Geometry containing the vertices of all the meshes, transformed by their global matrices """
+        first_geometry = mesh_list[0].geometry
+        data_list_dict = {variable_name: [] for variable_name in first_geometry.attribute_dict}
+        index_data_list = []
+        vertex_offset = 0
+        for mesh in mesh_list:
+            matrix = root_inverse_matrix @ mesh.global_matrix
+            rotation_matrix = matrix[0:3, 0:3]
+            for variable_name, attribute in mesh.geometry.attribute_dict.items():
+                data = np.asarray(attribute.data, dtype=float).reshape(len(attribute.data), attribute.component_count)
+                if variable_name in StaticBatcher.POSITION_NAME_LIST:
+                    data = data @ rotation_matrix.T + matrix[0:3, 3]
+                elif variable_name in StaticBatcher.NORMAL_NAME_LIST:
+                    # Shaders transform normals by the rotation submatrix of the model matrix, then normalize
+                    data = data @ rotation_matrix.T
+                data_list_dict[variable_name].append(data)
+            if mesh.geometry.index is not None:
+                index_data_list.append(np.asarray(mesh.geometry.index.data).ravel() + vertex_offset)
+            vertex_offset += len(mesh.geometry.attribute_dict["vertexPosition"].data)
+        geometry = Geometry()
+        for variable_name, attribute in first_geometry.attribute_dict.items():
+            geometry.add_attribute(attribute.data_type, variable_name,
+                                   np.concatenate(data_list_dict[variable_name]), upload=False)
+        if index_data_list:
+            geometry.set_indices(np.concatenate(index_data_list))
+        # Pack positions, UVs and normals into one vertex buffer
+        geometry.interleave()
+        geometry.count_vertices()
+        return geometry
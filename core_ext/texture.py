@@ -1,8 +1,31 @@
+import sys
+
 import OpenGL.GL as GL
+import numpy as np
 import pygame
 
+from core.gl_state import GLState
+
+
+def _flip_rows(rows, band_height=64):
+    """ Reverse the order of the rows of a 2D array in place, copying at most band_height rows at a time """
+    height = len(rows)
+    for top in range(0, height // 2, band_height):
+        count = min(band_height, height // 2 - top)
+        bottom = height - top - count
+        band = rows[top:top + count].copy()
+        rows[top:top + count] = rows[bottom:bottom + count][::-1]
+        rows[bottom:bottom + count] = band[::-1]
+
 
 class Texture:
+    # Property values used unless overwritten by a property dictionary
+    DEFAULT_PROPERTY_DICT = {
+        "magFilter": GL.GL_LINEAR,
+        "minFilter": GL.GL_LINEAR_MIPMAP_LINEAR,
+        "wrap": GL.GL_REPEAT
+    }
+
     def __init__(self, file_name=None, property_dict={}):
         # Pygame object for storing pixel data;
         # can load from image or manipulate directly
@@ -10,11 +33,7 @@ class Texture:
         # reference of available texture from GPU
         self._texture_ref = GL.glGenTextures(1)
         # default property values
-        self._property_dict = {
-            "magFilter": GL.GL_LINEAR,
-            "minFilter": GL.GL_LINEAR_MIPMAP_LINEAR,
-            "wrap": GL.GL_REPEAT
-        }
+        self._property_dict = dict(Texture.DEFAULT_PROPERTY_DICT)
         # Overwrite default property values
         self.set_properties(property_dict)
         if file_name is not None:
@@ -33,6 +52,12 @@ class Texture:
     def texture_ref(self):
         return self._texture_ref
 
+    def delete(self):
+        """ Free the texture on the GPU; the object must not be used afterwards """
+        GLState.forget_texture(self._texture_ref)
+        GL.glDeleteTextures([self._texture_ref])
+        self._texture_ref = None
+
     def load_image(self, file_name):
         """ Load image from file """
         self._surface = pygame.image.load(file_name)
@@ -47,17 +72,90 @@ class Texture:
                     raise Exception("Texture has no property with name: " + name)
 
 
-    def upload_data(self):
-        """ Upload pixel data to GPU """
-        # Store image dimensions
-        width = self._surface.get_width()
-        height = self._surface.get_height()
-        # Convert image data to string buffer
-        pixel_data = pygame.image.tostring(self._surface, "RGBA", True)
+    def upload_data(self, internal_format=None):
+        """
+        Upload the pixel data of the surface to GPU. By default, the texture only has
+        an alpha channel if the surface has one; render targets ask for GL_RGBA explicitly
+        """
+        width, height = self._surface.get_size()
+        layout = self._buffer_layout(self._surface)
+        if layout is not None and internal_format is not None and internal_format != layout[0]:
+            # The buffer of the surface has no alpha values to give to the texture
+            layout = None
+        if layout is None:
+            # Convert surfaces whose pixels cannot be read by OpenGL as they are
+            pixel_data = pygame.image.tostring(self._surface, "RGBA", True)
+            self._upload(width, height, GL.GL_RGBA, GL.GL_RGBA, pixel_data)
+            return
+        internal_format, pixel_format, alignment, row_length = layout
+        # View of the pixels of the surface, one row of pitch bytes per image row
+        rows = np.frombuffer(self._surface.get_buffer(), dtype=np.uint8).reshape(height, -1)
+        # Surfaces store the top row first and OpenGL expects the bottom row first.
+        # A reversed view (rows[::-1]) would be copied whole by PyOpenGL, which needs contiguous data,
+        # so flip the rows in place for the upload and restore them afterwards
+        _flip_rows(rows)
+        try:
+            self._upload(width, height, internal_format, pixel_format, rows, alignment, row_length)
+        finally:
+            _flip_rows(rows)
+
+    def upload_pixels(self, size, pixel_data, pixel_format="RGBA"):
+        """
+        Upload tightly packed pixel data, bottom row first, as returned by
+        pygame.image.tostring(surface, pixel_format, True) for "RGB" or "RGBA"
+        """
+        gl_format = {"RGB": GL.GL_RGB, "RGBA": GL.GL_RGBA}[pixel_format]
+        self._upload(size[0], size[1], gl_format, gl_format, pixel_data, alignment=1)
+
+    @staticmethod
+    def _buffer_layout(surface):
+        """
+        Describe the pixel buffer of a surface as (internal format, pixel format,
+        unpack alignment, unpack row length), or return None when OpenGL cannot read it directly
+        """
+        bytes_per_pixel = surface.get_bytesize()
+        if bytes_per_pixel not in (3, 4) or sys.byteorder != "little":
+            return None
+        # Transparency given by a color key or by the alpha of the whole surface is not in the pixel buffer;
+        # surfaces with per-pixel alpha report a surface alpha of 255
+        if surface.get_colorkey() is not None or surface.get_alpha() not in (None, 255):
+            return None
+        red_mask, green_mask, blue_mask, alpha_mask = surface.get_masks()
+        # In memory, the channel with mask 0xff comes first
+        if (red_mask, green_mask, blue_mask) == (0xff, 0xff00, 0xff0000):
+            pixel_format = GL.GL_RGB if bytes_per_pixel == 3 else GL.GL_RGBA
+        elif (red_mask, green_mask, blue_mask) == (0xff0000, 0xff00, 0xff):
+            pixel_format = GL.GL_BGR if bytes_per_pixel == 3 else GL.GL_BGRA
+        else:
+            return None
+        if alpha_mask not in (0, 0xff000000):
+            return None
+        # The unused byte of 32-bit surfaces without alpha is dropped by the internal format
+        internal_format = GL.GL_RGBA if alpha_mask else GL.GL_RGB
+        # Rows are padded to the pitch of the surface; describe the padding
+        # with the unpack alignment when possible, otherwise with the row length
+        width = surface.get_width()
+        pitch = surface.get_pitch()
+        for alignment in (8, 4, 2, 1):
+            if (width * bytes_per_pixel + alignment - 1) // alignment * alignment == pitch:
+                return internal_format, pixel_format, alignment, 0
+        if pitch % bytes_per_pixel == 0:
+            return internal_format, pixel_format, 1, pitch // bytes_per_pixel
+        return None
+
+    def _upload(self, width, height, internal_format, pixel_format, pixel_data, alignment=4, row_length=0):
+        """ Send pixel data to the texture and apply its properties """
         # Specify texture used by the following functions
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self._texture_ref)
+        GLState.bind_texture(0, self._texture_ref)
+        # Describe how rows are laid out in memory
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, alignment)
+        GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, row_length)
         # Send pixel data to texture buffer
-        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, width, height, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, pixel_data)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, internal_format, width, height, 0,
+                        pixel_format, GL.GL_UNSIGNED_BYTE, pixel_data)
+        # Restore the default layout
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 4)
+        GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, 0)
         # Generate mipmap image from uploaded pixel data
         GL.glGenerateMipmap(GL.GL_TEXTURE_2D)
         # Specify technique for magnifying/minifying textures
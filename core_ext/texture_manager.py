@@ -0,0 +1,88 @@
+"""Process-wide registry of textures loaded from image files."""
+import os
+
+from core_ext.texture import Texture
+
+
+class TextureManager:
+    """
+    Share one Texture (and one GPU texture object) between all users of the same
+    image file with the same properties.
+
+    acquire() returns the shared texture and counts a reference to it; release()
+    gives a reference back. Textures without references stay loaded, so they can
+    be acquired again for free, until evict_unused() frees them.
+    """
+    # Shared textures and their number of references, indexed by key
+    _texture_dict = {}
+    _reference_count_dict = {}
+
+    @staticmethod
+    def key(file_name, property_dict=None):
+        """ Registry key of an image file loaded with the given texture properties """
+        properties = dict(Texture.DEFAULT_PROPERTY_DICT)
+        if property_dict:
+            properties.update(property_dict)
+        path = os.path.normcase(os.path.abspath(file_name))
+        return path, tuple(sorted(properties.items()))
+
+    @classmethod
+    def acquire(cls, file_name, property_dict=None, image=None):
+        """
+        Return the shared texture for an image file, loading it on first use.
+        If image is given, it holds the already decoded file as (size, pixel format, pixel data)
+        and is uploaded with Texture.upload_pixels instead of reading the file.
+        """
+        key = cls.key(file_name, property_dict)
+        texture = cls._texture_dict.get(key)
+        if texture is None:
+            if image is None:
+                texture = Texture(file_name, property_dict)
+            else:
+                size, pixel_format, pixel_data = image
+                texture = Texture(property_dict=property_dict)
+                texture.upload_pixels(size, pixel_data, pixel_format)
+            cls._texture_dict[key] = texture
+            cls._reference_count_dict[key] = 0
+        cls._reference_count_dict[key] += 1
+        return texture
+
+    @classmethod
+    def contains(cls, file_name, property_dict=None):
+        """ Is the image file already loaded with these properties? """
+        return cls.key(file_name, property_dict) in cls._texture_dict
+
+    @classmethod
+    def reference_count(cls, file_name, property_dict=None):
+        return cls._reference_count_dict.get(cls.key(file_name, property_dict), 0)
+
+    @classmethod
+    def release(cls, texture):
+        """ Give back one reference to a texture returned by acquire() """
+        for key, registered_texture in cls._texture_dict.items():
+            if registered_texture is texture:
+                if cls._reference_count_dict[key] == 0:
+                    raise Exception("Texture released more times than acquired: " + key[0])
+                cls._reference_count_dict[key] -= 1
+                return
+        raise Exception("Texture was not acquired from the TextureManager")
+
+    @classmethod
+    def evict(cls, file_name, property_dict=None):
+        """ Free a texture that is no longer referenced """
+        key = cls.key(file_name, property_dict)
+        if key not in cls._texture_dict:
+            return
+        if cls._reference_count_dict[key] > 0:
+            raise Exception("Cannot evict texture still in use: " + key[0])
+        cls._texture_dict.pop(key).delete()
+        del cls._reference_count_dict[key]
+
+    @classmethod
+    def evict_unused(cls):
+        """ Free every texture that is no longer referenced; return how many were freed """
+        unused_keys = [key for key, count in cls._reference_count_dict.items() if count == 0]
+        for key in unused_keys:
+            cls._texture_dict.pop(key).delete()
+            del cls._reference_count_dict[key]
+        return len(unused_keys)
@@ -0,0 +1,135 @@
+import numpy as np
+
+
+class TransformStore:
+    """
+    Optional storage for the transformations of a subtree of the scene graph, for scenes with many objects.
+    The local matrices of all the objects are kept in one contiguous array, and each object's local matrix
+    becomes a view of its row, so the Object3D methods keep working. The global matrices are computed
+    all at once, one tree level at a time, with a batched matrix product, instead of one object at a time.
+    Objects added to or removed from the subtree are taken into account the next time a matrix is needed.
+    """
+    def __init__(self, root, dtype=np.float32):
+        # root of the subtree whose objects are stored
+        self._root = root
+        self._dtype = dtype
+        # Local and global matrices, shape (n, 4, 4); row 0 is the root
+        self._local_array = np.empty((0, 4, 4), dtype=dtype)
+        self._global_array = np.empty((0, 4, 4), dtype=dtype)
+        # Index of the parent of each object, -1 for the root
+        self._parent_index_array = np.empty(0, dtype=np.int64)
+        # For each tree level below the root, (first and last index + 1 of its objects, indices of their parents)
+        self._level_list = []
+        # Per-object views of the global matrices
+        self._global_view_list = []
+        self._node_list = []
+        # Must the global matrices, or the arrays themselves, be computed again?
+        self._dirty = True
+        self._structure_changed = True
+        self._update()
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def node_list(self):
+        return self._node_list
+
+    @property
+    def local_array(self):
+        return self._local_array
+
+    @property
+    def global_array(self):
+        """ Global matrices of the stored objects, in the order of node_list """
+        self._update()
+        return self._global_array
+
+    @property
+    def parent_index_array(self):
+        return self._parent_index_array
+
+    def mark_dirty(self):
+        """ A stored object was transformed """
+        self._dirty = True
+
+    def mark_structure_changed(self):
+        """ An object was added to or removed from the subtree """
+        self._structure_changed = True
+        self._dirty = True
+
+    def global_matrix(self, node):
+        """ Global matrix of a stored object; None if the object is no longer in the subtree """
+        self._update()
+        if node._transform_store is not self:
+            return None
+        return self._global_view_list[node._transform_index]
+
+    def release(self):
+        """ Give every stored object its own local matrix again; the store is no longer used """
+        for node in self._node_list:
+            self._detach(node)
+        self._node_list = []
+        self._global_view_list = []
+        self._level_list = []
+        self._structure_changed = False
+
+    def _update(self):
+        if self._structure_changed:
+            self._rebuild()
+        if not self._dirty:
+            return
+        # The root may have a parent outside the store
+        root_parent = self._root.parent
+        if root_parent is None:
+            self._global_array[0] = self._local_array[0]
+        else:
+            self._global_array[0] = root_parent.global_matrix @ self._local_array[0]
+        # Each level only depends on the level above it
+        for start, end, parent_index_array in self._level_list:
+            np.matmul(self._global_array[parent_index_array], self._local_array[start:end],
+                      out=self._global_array[start:end])
+        self._dirty = False
+
+    def _rebuild(self):
+        """ Store the objects currently in the subtree, keeping their local matrices """
+        node_list = []
+        depth_list = []
+        parent_index_list = []
+        # Breadth-first, so that each level is contiguous and parents come before their children
+        nodes_to_process = [(self._root, -1, 0)]
+        while nodes_to_process:
+            next_nodes_to_process = []
+            for node, parent_index, depth in nodes_to_process:
+                index = len(node_list)
+                node_list.append(node)
+                parent_index_list.append(parent_index)
+                depth_list.append(depth)
+                next_nodes_to_process.extend((child, index, depth + 1) for child in node.children_list)
+            nodes_to_process = next_nodes_to_process
+        local_array = np.empty((len(node_list), 4, 4), dtype=self._dtype)
+        for index, node in enumerate(node_list):
+            local_array[index] = node.local_matrix
+        # Objects that left the subtree get their own copy of their local matrix
+        node_set = set(node_list)
+        for node in self._node_list:
+            if node._transform_store is self and node not in node_set:
+                self._detach(node)
+        self._local_array = local_array
+        self._global_array = np.empty_like(local_array)
+        self._parent_index_array = np.array(parent_index_list, dtype=np.int64)
+        self._global_view_list = list(self._global_array)
+        self._node_list = node_list
+        for index, node in enumerate(node_list):
+            node._attach(self, index, local_array[index])
+        # The objects of each level are contiguous
+        level_start_array = np.searchsorted(depth_list, np.arange(1, depth_list[-1] + 2))
+        self._level_list = [(start, end, self._parent_index_array[start:end])
+                            for start, end in zip(level_start_array[:-1], level_start_array[1:])]
+        self._structure_changed = False
+        self._dirty = True
+
+    @staticmethod
+    def _detach(node):
+        node._attach(None, None, np.array(node.local_matrix, dtype=float))
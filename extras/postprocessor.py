@@ -16,12 +16,12 @@ class Postprocessor:
                  camera: Camera,
                  final_render_target=None):
         self._renderer = renderer
-        self._scene_list = [scene]
-        self._camera_list = [camera]
+        self._scene = scene
+        self._camera = camera
+        # One rectangle mesh per effect, drawn with the effect material
+        self._effect_mesh_list = []
         self._render_target_list = [final_render_target]
         self._final_render_target = final_render_target
-        self._ortho_camera = Camera()
-        self._ortho_camera.set_orthographic()  # aligned with clip space
         # By default, generate a rectangle already aligned with clip space;
         # no matrix transformations will be applied
         self._rectangle_geometry = Geometry()
@@ -38,7 +38,6 @@ class Postprocessor:
         return self._render_target_list
 
     def add_effect(self, effect):
-        post_scene = Scene()
         resolution = self._renderer.window_size
         target = RenderTarget(resolution=resolution)
         # Change the previous entry in the render target list
@@ -47,16 +46,12 @@ class Postprocessor:
         # The effect in this render pass will use the texture
         # that was written to in the previous render pass
         effect.uniform_dict["textureSampler"].data[0] = target.texture.texture_ref
-        mesh = Mesh(self._rectangle_geometry, effect)
-        post_scene.add(mesh)
-        self._scene_list.append(post_scene)
-        self._camera_list.append(self._ortho_camera)
+        self._effect_mesh_list.append(Mesh(self._rectangle_geometry, effect))
         self._render_target_list.append(self._final_render_target)
 
     def render(self):
-        passes = len(self._scene_list)
-        for n in range(passes):
-            scene = self._scene_list[n]
-            camera = self._camera_list[n]
-            target = self._render_target_list[n]
-            self._renderer.render(scene, camera, render_target=target)
+        # Only the first pass renders the scene (and its shadows);
+        # each effect then draws one rectangle reading the target of the previous pass
+        self._renderer.render(self._scene, self._camera, render_target=self._render_target_list[0])
+        for mesh, target in zip(self._effect_mesh_list, self._render_target_list[1:]):
+            self._renderer.render_fullscreen(mesh, render_target=target)
@@ -1,24 +1,28 @@
 from typing import List, Tuple, Dict
+import numpy as np
 from geometry.geometry import Geometry
 
-def CustomGeometry(sx, sy, sz, obj_groups: List[Tuple[str, List, List, List]]) -> Dict[str, Geometry]:
+def CustomGeometry(sx, sy, sz, obj_groups: List[Tuple]) -> Dict[str, Geometry]:
     geometries = {}
 
-    for material_name, group_vertices, group_uvs, group_normals in obj_groups:
+    for material_name, group_vertices, group_uvs, group_normals, *group_indices in obj_groups:
         geometry = Geometry()
-        geometry.add_attribute("vec3", "vertexPosition", group_vertices)
+        geometry.add_attribute("vec3", "vertexPosition", group_vertices, upload=False)
 
-        if not group_uvs or len(group_uvs) != len(group_vertices):
-            group_uvs = [[0.0, 0.0] for _ in group_vertices]
-        geometry.add_attribute("vec2", "vertexUV", group_uvs)
+        if len(group_uvs) != len(group_vertices):
+            group_uvs = np.zeros((len(group_vertices), 2), dtype=np.float32)
+        geometry.add_attribute("vec2", "vertexUV", group_uvs, upload=False)
 
-        if not group_normals or len(group_normals) != len(group_vertices):
-            normal = [0.0, 0.0, 1.0]
-            group_normals = [normal] * len(group_vertices)
-        geometry.add_attribute("vec3", "vertexNormal", group_normals)
-        geometry.add_attribute("vec3", "faceNormal", group_normals)
+        if len(group_normals) != len(group_vertices):
+            group_normals = np.tile(np.array([0.0, 0.0, 1.0], dtype=np.float32), (len(group_vertices), 1))
+        geometry.add_attribute("vec3", "vertexNormal", group_normals, upload=False)
+        geometry.add_attribute("vec3", "faceNormal", group_normals, upload=False)
 
+        # Pack positions, UVs and normals into one vertex buffer
+        geometry.interleave()
         geometry.count_vertices()
+        if group_indices:
+            geometry.set_indices(group_indices[0])
 
         # Adiciona a geometry ao dicionário com a key sendo o nome do material
         geometries[material_name] = geometry
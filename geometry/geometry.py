@@ -1,5 +1,7 @@
 import numpy as np
 from core.attribute import Attribute
+from core.index import Index
+from core.interleaved_buffer import InterleavedBuffer
 
 
 class Geometry:
@@ -10,84 +12,167 @@ class Geometry:
         self._attribute_dict = {}
         # number of vertices
         self._vertex_count = None
+        # Optional vertex indices; when present, primitives are assembled
+        # from these indices instead of from consecutive vertices
+        self._index = None
+        # Bounding volumes of the vertex positions, computed when first needed
+        self._bounding_box = None
+        self._bounding_sphere = None
+        # Incremented whenever the attributes, their buffers or the index buffer change,
+        # so that vertex array objects built for an older layout are replaced
+        self._layout_version = 0
 
     @property
     def attribute_dict(self):
         return self._attribute_dict
 
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def layout_version(self):
+        return self._layout_version
+
     @property
     def vertex_count(self):
         return self._vertex_count
 
-    def add_attribute(self, data_type, variable_name, data):
-        attribute = Attribute(data_type, data)
+    @property
+    def bounding_box(self):
+        """
+        Axis-aligned box containing every vertex position, as (center, half extents) in local coordinates;
+        None if the geometry has no positions. Computed again after new positions are uploaded.
+        """
+        if self._bounding_box is None:
+            self._compute_bounding_volumes()
+        return self._bounding_box
+
+    @property
+    def bounding_sphere(self):
+        """ Sphere containing every vertex position, as (center, radius) in local coordinates; None if no positions """
+        if self._bounding_box is None:
+            self._compute_bounding_volumes()
+        return self._bounding_sphere
+
+    def _compute_bounding_volumes(self):
+        attribute = self._attribute_dict.get("vertexPosition", None)
+        if attribute is None or len(attribute.data) == 0:
+            return
+        position_array = np.asarray(attribute.data, dtype=float).reshape(len(attribute.data), -1)
+        # Two-dimensional positions lie in the plane z = 0
+        if position_array.shape[1] < 3:
+            position_array = np.pad(position_array, ((0, 0), (0, 3 - position_array.shape[1])))
+        position_array = position_array[:, 0:3]
+        minimum = position_array.min(axis=0)
+        maximum = position_array.max(axis=0)
+        center = (minimum + maximum) / 2
+        self._bounding_box = (center, (maximum - minimum) / 2)
+        # Centered on the box, the sphere only needs to reach the farthest vertex
+        radius = np.sqrt(((position_array - center) ** 2).sum(axis=1).max())
+        self._bounding_sphere = (center, radius)
+
+    def add_attribute(self, data_type, variable_name, data, upload=True, usage="static"):
+        """
+        Add an attribute; with upload=False its data is not sent to the GPU
+        until interleave() packs it with the other attributes.
+        Attributes whose data changes should use the "dynamic" usage,
+        or "stream" when all the data changes every frame.
+        """
+        attribute = Attribute(data_type, data, upload, usage)
         self._attribute_dict[variable_name] = attribute
+        self._layout_version += 1
         # Update the vertex count
         if variable_name == "vertexPosition":
             # Number of vertices may be calculated from
             # the length of any Attribute object's array of data
             self._vertex_count = len(data)
+            self._bounding_box = None
+
+    def set_indices(self, data):
+        """ Draw this geometry from the vertex indices in data (None removes the indices) """
+        if data is None:
+            if self._index is not None:
+                self._layout_version += 1
+            self._index = None
+        elif self._index is None:
+            self._index = Index(data)
+            self._layout_version += 1
+        else:
+            self._index.data = data
+            self._index.upload_data()
+
+    def delete(self):
+        """ Free the vertex and index buffers on the GPU; the geometry must not be drawn afterwards """
+        deleted_buffer_list = []
+        for attribute in self._attribute_dict.values():
+            interleaved_buffer = attribute.interleaved_buffer
+            if interleaved_buffer is None:
+                attribute.delete()
+            elif interleaved_buffer not in deleted_buffer_list:
+                interleaved_buffer.delete()
+                deleted_buffer_list.append(interleaved_buffer)
+        if self._index is not None:
+            self._index.delete()
+
+    def interleave(self, variable_names=None, usage=None):
+        """
+        Store the data of the given attributes (by default, all of them) in a single
+        interleaved buffer, so each vertex is read from one contiguous block of memory.
+        By default, the buffer uses the usage of the attribute that changes most often.
+        """
+        if not variable_names:
+            variable_names = self._attribute_dict.keys()
+        attribute_list = [self._attribute_dict[variable_name] for variable_name in variable_names
+                          if self._attribute_dict[variable_name].interleaved_buffer is None]
+        if not attribute_list:
+            return
+        if usage is None:
+            usage_list = list(Attribute.USAGE_DICT)
+            usage = max((attribute.usage for attribute in attribute_list), key=usage_list.index)
+        InterleavedBuffer(attribute_list, usage)
+        self._layout_version += 1
 
     def upload_data(self, variable_names=None):
         if not variable_names:
             variable_names = self._attribute_dict.keys()
+        # Attributes sharing an interleaved buffer are uploaded together, once
+        uploaded_buffer_list = []
         for variable_name in variable_names:
-            self._attribute_dict[variable_name].upload_data()
+            interleaved_buffer = self._attribute_dict[variable_name].interleaved_buffer
+            if interleaved_buffer not in uploaded_buffer_list:
+                self._attribute_dict[variable_name].upload_data()
+                if interleaved_buffer is not None:
+                    uploaded_buffer_list.append(interleaved_buffer)
             # Update the vertex count
             if variable_name == "vertexPosition":
                 # Number of vertices may be calculated from
                 # the length of any Attribute object's array of data
                 self._vertex_count = len(self._attribute_dict[variable_name].data)
+                # Positions may have changed
+                self._bounding_box = None
 
     def apply_matrix(self, matrix):
-        """ Transform the data in an attribute using a matrix """
-        old_position_data = self._attribute_dict["vertexPosition"].data
-        new_position_data = []
-        for old_pos in old_position_data:
-            # Avoid changing list references
-            new_pos = old_pos.copy()
-            # Add the homogeneous fourth coordinate
-            new_pos.append(1)
-            # Multiply by matrix.
-            # No need to transform new_pos to np.array.
-            new_pos = matrix @ new_pos
-            # Remove the homogeneous coordinate
-            new_pos = list(new_pos[0:3])
-            # Add to the new data list
-            new_position_data.append(new_pos)
-        self._attribute_dict["vertexPosition"].data = new_position_data
-        # New data must be uploaded
-        self._attribute_dict["vertexPosition"].upload_data()
-        self._vertex_count = len(new_position_data)
-
-        # Extract the rotation submatrix
-        rotation_matrix = np.array(
-            [matrix[0][0:3],
-             matrix[1][0:3],
-             matrix[2][0:3]]
-        ).astype(float)
-
-        old_vertex_normal_data = self._attribute_dict["vertexNormal"].data
-        new_vertex_normal_data = []
-        for old_normal in old_vertex_normal_data:
-            # Avoid changing list references
-            new_normal = old_normal.copy()
-            new_normal = rotation_matrix @ new_normal
-            new_vertex_normal_data.append(new_normal)
-        self._attribute_dict["vertexNormal"].data = new_vertex_normal_data
-        # New data must be uploaded
-        self._attribute_dict["vertexNormal"].upload_data()
-
-        old_face_normal_data = self._attribute_dict["faceNormal"].data
-        new_face_normal_data = []
-        for old_normal in old_face_normal_data:
-            # Avoid changing list references
-            new_normal = old_normal.copy()
-            new_normal = rotation_matrix @ new_normal
-            new_face_normal_data.append(new_normal)
-        self._attribute_dict["faceNormal"].data = new_face_normal_data
-        # New data must be uploaded
-        self._attribute_dict["faceNormal"].upload_data()
+        """ Transform the positions and normals of the vertices using a matrix """
+        matrix = np.asarray(matrix, dtype=float)
+        rotation_matrix = matrix[0:3, 0:3]
+        variable_name_list = []
+        for variable_name in ["vertexPosition", "vertexNormal", "faceNormal"]:
+            attribute = self._attribute_dict.get(variable_name, None)
+            if attribute is None:
+                continue
+            data = self._data_array(attribute)
+            # Normals only go through the rotation submatrix
+            data = data @ rotation_matrix.T
+            if variable_name == "vertexPosition":
+                data += matrix[0:3, 3]
+            # The data is replaced, never written in place: it may be shared with other attributes
+            # (vertexNormal and faceNormal) or with the caller, such as the groups of an OBJ reader
+            attribute.data = data
+            attribute.mark_dirty()
+            variable_name_list.append(variable_name)
+        # The new values are uploaded into the existing buffers
+        self.upload_data(variable_name_list)
 
     def count_vertices(self):
         # Number of vertices may be calculated from the length of
@@ -95,12 +180,28 @@ class Geometry:
         attribute = list(self._attribute_dict.values())[0]
         self._vertex_count = len(attribute.data)
 
+    @staticmethod
+    def _data_array(attribute):
+        """ Data of an attribute as an array with one row per vertex; lists of values are converted """
+        return np.asarray(attribute.data, dtype=float).reshape(len(attribute.data), attribute.component_count)
+
     def merge(self, other_geometry):
         """
         Merge data from attributes of other geometry into this object.
-        Requires both geometries to have attributes with same names.
+        Requires both geometries to have attributes with same names,
+        and either both or neither to be indexed.
         """
+        if (self._index is None) != (other_geometry.index is None):
+            raise Exception("Cannot merge an indexed geometry with a non-indexed geometry")
+        if self._index is not None:
+            # Indices of the other geometry refer to vertices appended after ours
+            offset = len(self._attribute_dict["vertexPosition"].data)
+            self.set_indices(np.concatenate((np.asarray(self._index.data).ravel(),
+                                             np.asarray(other_geometry.index.data).ravel() + offset)))
         for variable_name, attribute_instance in self._attribute_dict.items():
-            attribute_instance.data.extend(other_geometry.attribute_dict[variable_name].data)
-            # New data must be uploaded
-            attribute_instance.upload_data()
+            other_attribute = other_geometry.attribute_dict[variable_name]
+            attribute_instance.data = np.concatenate((self._data_array(attribute_instance),
+                                                      self._data_array(other_attribute)))
+            attribute_instance.mark_dirty()
+        # The buffers only grow if the merged data does not fit in them
+        self.upload_data()
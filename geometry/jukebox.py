@@ -1,7 +1,8 @@
 from typing import List, Tuple
+import numpy as np
 from geometry.geometry import Geometry
 
-def JukeboxGeometry(sx, sy, sz, obj_groups: List[Tuple[str, List, List, List]]):
+def JukeboxGeometry(sx, sy, sz, obj_groups: List[Tuple]):
     wood_geometry = None
     neon_geometry = None
     metal_geometry = None
@@ -14,36 +15,38 @@ def JukeboxGeometry(sx, sy, sz, obj_groups: List[Tuple[str, List, List, List]]):
     songs2_geometry = None
     glass_geometry = None
 
-    for material_name, group_vertices, group_uvs, group_normals in obj_groups:
+    for material_name, group_vertices, group_uvs, group_normals, *group_indices in obj_groups:
         geometry = Geometry()
-        geometry.add_attribute("vec3", "vertexPosition", group_vertices)
+        geometry.add_attribute("vec3", "vertexPosition", group_vertices, upload=False)
 
-        if not group_uvs or len(group_uvs) != len(group_vertices):
-            group_uvs = [[0.0, 0.0] for _ in group_vertices]
+        if len(group_uvs) != len(group_vertices):
+            group_uvs = np.zeros((len(group_vertices), 2), dtype=np.float32)
+        group_uvs = np.asarray(group_uvs, dtype=np.float32)
 
         # Handle UV mapping for selectsong and songlist geometries
         if material_name in ["selectsong", "songlist1", "songlist2"]:
             # Get the bounds of the UV coordinates
-            u_coords = [uv[0] for uv in group_uvs]
-            v_coords = [uv[1] for uv in group_uvs]
-            min_u, max_u = min(u_coords), max(u_coords)
-            min_v, max_v = min(v_coords), max(v_coords)
+            min_uv = group_uvs.min(axis=0)
+            extent = group_uvs.max(axis=0) - min_uv
 
             # Normalize UV coordinates to fit within [0,1] range
-            group_uvs = [[
-                (uv[0] - min_u) / (max_u - min_u) if (max_u - min_u) != 0 else 0.0,
-                1.0 - (uv[1] - min_v) / (max_v - min_v) if (max_v - min_v) != 0 else 0.0
-            ] for uv in group_uvs]
+            normalized = np.divide(group_uvs - min_uv, extent,
+                                   out=np.zeros_like(group_uvs), where=extent != 0)
+            normalized[:, 1] = np.where(extent[1] != 0, 1.0 - normalized[:, 1], 0.0)
+            group_uvs = normalized
 
-        geometry.add_attribute("vec2", "vertexUV", group_uvs)
+        geometry.add_attribute("vec2", "vertexUV", group_uvs, upload=False)
 
-        if not group_normals or len(group_normals) != len(group_vertices):
-            normal = [0.0, 0.0, 1.0]
-            group_normals = [normal] * len(group_vertices)
-        geometry.add_attribute("vec3", "vertexNormal", group_normals)
-        geometry.add_attribute("vec3", "faceNormal", group_normals)
+        if len(group_normals) != len(group_vertices):
+            group_normals = np.tile(np.array([0.0, 0.0, 1.0], dtype=np.float32), (len(group_vertices), 1))
+        geometry.add_attribute("vec3", "vertexNormal", group_normals, upload=False)
+        geometry.add_attribute("vec3", "faceNormal", group_normals, upload=False)
 
+        # Pack positions, UVs and normals into one vertex buffer
+        geometry.interleave()
         geometry.count_vertices()
+        if group_indices:
+            geometry.set_indices(group_indices[0])
 
         if material_name == "wood":
             wood_geometry = geometry
@@ -1,4 +1,5 @@
 import OpenGL.GL as GL
+import numpy as np
 
 from core_ext.camera import Camera
 from core_ext.render_target import RenderTarget
@@ -14,7 +15,8 @@ class Shadow:
                  bias=0.01,
                  spotlight=False,  # Adicionando parâmetro para verificar se é spotlight
                  spotlight_fov=45,  # FOV para spotlight
-                 spotlight_cone_angle=30):  # Ângulo do cone
+                 spotlight_cone_angle=30,  # Ângulo do cone
+                 split_casters=True):
 
         self._light_source = light_source
         self._spotlight = spotlight
@@ -39,8 +41,25 @@ class Shadow:
             property_dict={"wrap": GL.GL_CLAMP_TO_BORDER}
         )
         self._material = DepthMaterial()
+        # Depth material for instanced meshes, created when first needed
+        self._instanced_material = None
         self._strength = strength
         self._bias = bias
+        # The shadow map is only rendered again when the light or a caster changes.
+        # Incremented each time the shadow map is rendered
+        self._version = 0
+        # View and projection of the light, and state of each caster, when the shadow map was last rendered
+        self._light_state = None
+        self._caster_state_dict = {}
+        # With split casters, the casters that never moved are rendered into their own render target,
+        # only when they change; it is copied into the shadow map before drawing the casters that moved
+        self._split_casters = split_casters
+        self._static_render_target = None
+        self._static_caster_list = []
+        self._dynamic_caster_list = []
+        self._dynamic_caster_set = set()
+        # Must the static render target be rendered again?
+        self._static_changed = True
 
     @property
     def bias(self):
@@ -54,6 +73,13 @@ class Shadow:
     def material(self):
         return self._material
 
+    @property
+    def instanced_material(self):
+        if self._instanced_material is None:
+            self._instanced_material = DepthMaterial(instanced=True)
+            self._update_camera_uniforms(self._instanced_material)
+        return self._instanced_material
+
     @property
     def light_source(self):
         return self._light_source
@@ -66,7 +92,83 @@ class Shadow:
     def strength(self):
         return self._strength
 
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def split_casters(self):
+        return self._split_casters
+
+    @property
+    def static_render_target(self):
+        if self._static_render_target is None:
+            self._static_render_target = RenderTarget(
+                (self._render_target.width, self._render_target.height),
+                property_dict={"wrap": GL.GL_CLAMP_TO_BORDER}
+            )
+        return self._static_render_target
+
+    @property
+    def static_caster_list(self):
+        return self._static_caster_list
+
+    @property
+    def dynamic_caster_list(self):
+        return self._dynamic_caster_list
+
+    @property
+    def static_changed(self):
+        return self._static_changed
+
+    def update_casters(self, caster_list):
+        """
+        Compare the light and the casters with their state when the shadow map was last rendered;
+        return True if the shadow map must be rendered again.
+        With split casters, a caster that moves is drawn every time the shadow map is rendered from then on,
+        and the others are kept in the static render target, which needs rendering again if static_changed is True.
+        """
+        light_state = (
+            np.asarray(self._camera.view_matrix).tobytes(),
+            np.asarray(self._camera.projection_matrix).tobytes()
+        )
+        caster_state_dict = {mesh: self._caster_state(mesh) for mesh in caster_list}
+        light_changed = light_state != self._light_state
+        if not self._split_casters:
+            changed = light_changed or caster_state_dict != self._caster_state_dict
+            self._static_changed = False
+            self._dynamic_caster_list = caster_list
+        else:
+            # Casters no longer drawn are forgotten
+            self._dynamic_caster_set &= caster_state_dict.keys()
+            for mesh, state in caster_state_dict.items():
+                if mesh in self._caster_state_dict and self._caster_state_dict[mesh] != state:
+                    self._dynamic_caster_set.add(mesh)
+            static_caster_list = [mesh for mesh in caster_list if mesh not in self._dynamic_caster_set]
+            dynamic_caster_list = [mesh for mesh in caster_list if mesh in self._dynamic_caster_set]
+            # The state of a static caster is unchanged, otherwise it would now be dynamic
+            self._static_changed = light_changed or static_caster_list != self._static_caster_list
+            changed = (self._static_changed or dynamic_caster_list != self._dynamic_caster_list
+                       or any(caster_state_dict[mesh] != self._caster_state_dict[mesh] for mesh in dynamic_caster_list))
+            self._static_caster_list = static_caster_list
+            self._dynamic_caster_list = dynamic_caster_list
+        self._light_state = light_state
+        self._caster_state_dict = caster_state_dict
+        if changed:
+            self._version += 1
+        return changed
+
+    @staticmethod
+    def _caster_state(mesh):
+        """ Values that change the shadow of a caster: its global matrix and, for instanced meshes, its instances """
+        return np.asarray(mesh.global_matrix).tobytes(), getattr(mesh, "instance_version", None)
+
     def update_internal(self):
         self._camera.update_view_matrix()
-        self._material.uniform_dict["viewMatrix"].data = self._camera.view_matrix
-        self._material.uniform_dict["projectionMatrix"].data = self._camera.projection_matrix
+        self._update_camera_uniforms(self._material)
+        if self._instanced_material is not None:
+            self._update_camera_uniforms(self._instanced_material)
+
+    def _update_camera_uniforms(self, material):
+        material.uniform_dict["viewMatrix"].data = self._camera.view_matrix
+        material.uniform_dict["projectionMatrix"].data = self._camera.projection_matrix
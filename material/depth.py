@@ -3,17 +3,26 @@ from material.material import Material
 
 class DepthMaterial(Material):
 
-    def __init__(self):
+    def __init__(self, instanced=False):
+        # Instanced depth materials also apply the model matrix of each instance
+        self._instanced = instanced
+        if instanced:
+            declaring_instance_matrix = "in mat4 instanceMatrix;"
+            world_matrix = "modelMatrix * instanceMatrix"
+        else:
+            declaring_instance_matrix = ""
+            world_matrix = "modelMatrix"
         # vertex shader code
         vertex_shader_code = """
         in vec3 vertexPosition;
         uniform mat4 projectionMatrix;
         uniform mat4 viewMatrix;
         uniform mat4 modelMatrix;
+        """ + declaring_instance_matrix + """
         
         void main()
         {
-            gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(vertexPosition, 1);
+            gl_Position = projectionMatrix * viewMatrix * """ + world_matrix + """ * vec4(vertexPosition, 1);
         }
         """
 
@@ -31,3 +40,7 @@ class DepthMaterial(Material):
         # Initialize shaders
         super().__init__(vertex_shader_code, fragment_shader_code)
         self.locate_uniforms()
+
+    @property
+    def instanced(self):
+        return self._instanced
@@ -1,5 +1,6 @@
 import OpenGL.GL as GL
 
+from core.gl_state import GLState
 from material.lighted import LightedMaterial
 
 
@@ -66,13 +67,13 @@ class EmissiveMaterial(LightedMaterial):
 
     def update_render_settings(self):
         if self.setting_dict["doubleSide"]:
-            GL.glDisable(GL.GL_CULL_FACE)
+            GLState.disable(GL.GL_CULL_FACE)
         else:
-            GL.glEnable(GL.GL_CULL_FACE)
+            GLState.enable(GL.GL_CULL_FACE)
 
         if self.setting_dict["wireframe"]:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
         else:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
 
-        GL.glLineWidth(self.setting_dict["lineWidth"])
\ No newline at end of file
+        GLState.line_width(self.setting_dict["lineWidth"])
\ No newline at end of file
@@ -1,5 +1,6 @@
 import OpenGL.GL as GL
 
+from core.gl_state import GLState
 from material.lighted import LightedMaterial
 
 
@@ -7,13 +8,12 @@ class FlatMaterial(LightedMaterial):
     """
     Flat material with at least one light source (or more)
     """
-    def __init__(self, texture=None, property_dict=None, number_of_light_sources=1):
-        super().__init__(number_of_light_sources)
+    def __init__(self, texture=None, property_dict=None, number_of_light_sources=1, instanced=False):
+        # The texture is compiled into the shaders only when there is one
+        feature_list = [] if texture is None else ["USE_TEXTURE"]
+        super().__init__(number_of_light_sources, instanced, feature_list)
         self.add_uniform("vec3", "baseColor", [1.0, 1.0, 1.0])
-        if texture is None:
-            self.add_uniform("bool", "useTexture", False)
-        else:
-            self.add_uniform("bool", "useTexture", True)
+        if texture is not None:
             self.add_uniform("sampler2D", "textureSampler", [texture.texture_ref, 1])
         self.locate_uniforms()
 
@@ -27,7 +27,7 @@ class FlatMaterial(LightedMaterial):
 
     @property
     def vertex_shader_code(self):
-        return """
+        return self.uniform_block_extension_in_shader_code + """
             struct Light
             {
                 int lightType;  // 1 = AMBIENT, 2 = DIRECTIONAL, 3 = POINT, 4 = SPOTLIGHT
@@ -96,10 +96,8 @@ class FlatMaterial(LightedMaterial):
                 }
                 return light.color * (ambient + diffuse + specular);
             }
-            
-            uniform mat4 projectionMatrix;
-            uniform mat4 viewMatrix;
-            uniform mat4 modelMatrix;
+            """ + self.declaring_camera_block_in_shader_code + """
+            """ + self.declaring_model_matrix_in_shader_code + """
             in vec3 vertexPosition;
             in vec2 vertexUV;
             in vec3 faceNormal;
@@ -108,29 +106,33 @@ class FlatMaterial(LightedMaterial):
             
             void main()
             {
-                gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(vertexPosition, 1);
+                """ + self.computing_world_matrix_in_shader_code + """
+                gl_Position = projectionMatrix * viewMatrix * worldMatrix * vec4(vertexPosition, 1);
                 UV = vertexUV;
                 // Calculate total effect of lights on color
-                vec3 position = vec3(modelMatrix * vec4(vertexPosition, 1));
-                vec3 calcNormal = normalize(mat3(modelMatrix) * faceNormal);
+                vec3 position = vec3(worldMatrix * vec4(vertexPosition, 1));
+                vec3 calcNormal = normalize(mat3(worldMatrix) * faceNormal);
                 light = vec3(0, 0, 0);""" + self.adding_lights_in_shader_code + """
             }
         """
 
     @property
     def fragment_shader_code(self):
-        return """
+        return self.defining_features_in_shader_code + """
             uniform vec3 baseColor;
-            uniform bool useTexture;
+            """ + self.declaring_instance_color_in_shader_code + """
+            #ifdef USE_TEXTURE
             uniform sampler2D textureSampler;
+            #endif
             in vec2 UV;
             in vec3 light;
             out vec4 fragColor;
             void main()
             {
-                vec4 color = vec4(baseColor, 1.0);
-                if (useTexture)
-                    color *= texture(textureSampler, UV);
+                vec4 color = vec4(""" + self.base_color_in_shader_code + """, 1.0);
+                #ifdef USE_TEXTURE
+                color *= texture(textureSampler, UV);
+                #endif
                 color *= vec4(light, 1);
                 fragColor = color;
             }
@@ -138,11 +140,11 @@ class FlatMaterial(LightedMaterial):
 
     def update_render_settings(self):
         if self.setting_dict["doubleSide"]:
-            GL.glDisable(GL.GL_CULL_FACE)
+            GLState.disable(GL.GL_CULL_FACE)
         else:
-            GL.glEnable(GL.GL_CULL_FACE)
+            GLState.enable(GL.GL_CULL_FACE)
         if self.setting_dict["wireframe"]:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
         else:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
-        GL.glLineWidth(self.setting_dict["lineWidth"])
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
+        GLState.line_width(self.setting_dict["lineWidth"])
@@ -1,5 +1,6 @@
 import OpenGL.GL as GL
 
+from core.gl_state import GLState
 from material.lighted import LightedMaterial
 
 
@@ -12,27 +13,28 @@ class LambertMaterial(LightedMaterial):
                  property_dict=None,
                  number_of_light_sources=1,
                  bump_texture=None,
-                 use_shadow=False):
-        super().__init__(number_of_light_sources)
+                 use_shadow=False,
+                 instanced=False):
+        # Optional features are compiled into the shaders, so that no fragment
+        # tests them and their uniforms only exist when they are used
+        feature_list = []
+        if texture is not None:
+            feature_list.append("USE_TEXTURE")
+        if bump_texture is not None:
+            feature_list.append("USE_BUMP_TEXTURE")
+        if use_shadow:
+            feature_list.append("USE_SHADOW")
+        super().__init__(number_of_light_sources, instanced, feature_list)
         self.add_uniform("vec3", "baseColor", [1.0, 1.0, 1.0])
 
-        if texture is None:
-            self.add_uniform("bool", "useTexture", False)
-        else:
-            self.add_uniform("bool", "useTexture", True)
+        if texture is not None:
             self.add_uniform("sampler2D", "textureSampler", [texture.texture_ref, 1])
 
-        if bump_texture is None:
-            self.add_uniform("bool", "useBumpTexture", False)
-        else:
-            self.add_uniform("bool", "useBumpTexture", True)
+        if bump_texture is not None:
             self.add_uniform("sampler2D", "bumpTextureSampler", [bump_texture.texture_ref, 2])
             self.add_uniform("float", "bumpStrength", 1.0)
 
-        if not use_shadow:
-            self.add_uniform("bool", "useShadow", False)
-        else:
-            self.add_uniform("bool", "useShadow", True)
+        if use_shadow:
             self.add_uniform("Shadow", "shadow0", None)
 
         self.locate_uniforms()
@@ -47,10 +49,10 @@ class LambertMaterial(LightedMaterial):
 
     @property
     def vertex_shader_code(self):
-        return """
-            uniform mat4 projectionMatrix;
-            uniform mat4 viewMatrix;
-            uniform mat4 modelMatrix;
+        return self.uniform_block_extension_in_shader_code \
+            + self.defining_features_in_shader_code \
+            + self.declaring_camera_block_in_shader_code + """
+            """ + self.declaring_model_matrix_in_shader_code + """
             in vec3 vertexPosition;
             in vec2 vertexUV;
             in vec3 vertexNormal;
@@ -58,6 +60,7 @@ class LambertMaterial(LightedMaterial):
             out vec2 UV;
             out vec3 normal;
             
+            #ifdef USE_SHADOW
             struct Shadow
             {
                 // direction of light that casts shadow
@@ -73,28 +76,29 @@ class LambertMaterial(LightedMaterial):
                 float bias;
             };
             
-            uniform bool useShadow;
             uniform Shadow shadow0;
             out vec3 shadowPosition0;
+            #endif
 
             void main()
             {
-                gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(vertexPosition, 1);
-                position = vec3(modelMatrix * vec4(vertexPosition, 1));
+                """ + self.computing_world_matrix_in_shader_code + """
+                gl_Position = projectionMatrix * viewMatrix * worldMatrix * vec4(vertexPosition, 1);
+                position = vec3(worldMatrix * vec4(vertexPosition, 1));
                 UV = vertexUV;
-                normal = normalize(mat3(modelMatrix) * vertexNormal);
+                normal = normalize(mat3(worldMatrix) * vertexNormal);
                 
-                if (useShadow)
-                {
-                    vec4 temp0 = shadow0.projectionMatrix * shadow0.viewMatrix * modelMatrix * vec4(vertexPosition, 1);
-                    shadowPosition0 = vec3(temp0);
-                }            
+                #ifdef USE_SHADOW
+                vec4 temp0 = shadow0.projectionMatrix * shadow0.viewMatrix * worldMatrix * vec4(vertexPosition, 1);
+                shadowPosition0 = vec3(temp0);
+                #endif
             }
         """
 
     @property
     def fragment_shader_code(self):
-        return """        
+        return self.uniform_block_extension_in_shader_code \
+            + self.defining_features_in_shader_code + """
             struct Light
             {
                 int lightType;  // 1 = AMBIENT, 2 = DIRECTIONAL, 3 = POINT, 4 = SPOT
@@ -168,16 +172,20 @@ class LambertMaterial(LightedMaterial):
             }
             
             uniform vec3 baseColor;
-            uniform bool useTexture;
+            """ + self.declaring_instance_color_in_shader_code + """
+            #ifdef USE_TEXTURE
             uniform sampler2D textureSampler;
-            uniform bool useBumpTexture;
+            #endif
+            #ifdef USE_BUMP_TEXTURE
             uniform sampler2D bumpTextureSampler;
             uniform float bumpStrength;
+            #endif
             in vec3 position;
             in vec2 UV;
             in vec3 normal;
             out vec4 fragColor;
             
+            #ifdef USE_SHADOW
             struct Shadow
             {
                 // direction of light that casts shadow
@@ -193,44 +201,41 @@ class LambertMaterial(LightedMaterial):
                 float bias;
             };
             
-            uniform bool useShadow;
             uniform Shadow shadow0;
             in vec3 shadowPosition0;
+            #endif
 
             void main()
             {
-                vec4 color = vec4(baseColor, 1.0);
-                if (useTexture) 
-                {
-                    color *= texture(textureSampler, UV );
-                }
+                vec4 color = vec4(""" + self.base_color_in_shader_code + """, 1.0);
+                #ifdef USE_TEXTURE
+                color *= texture(textureSampler, UV );
+                #endif
                 vec3 calcNormal = normal;
-                if (useBumpTexture) 
-                {
-                    calcNormal += bumpStrength * vec3(texture(bumpTextureSampler, UV));
-                }
+                #ifdef USE_BUMP_TEXTURE
+                calcNormal += bumpStrength * vec3(texture(bumpTextureSampler, UV));
+                #endif
                 // Calculate total effect of lights on color
                 vec3 light = vec3(0, 0, 0);""" + self.adding_lights_in_shader_code + """
                 color *= vec4(light, 1);
                 
-                if (useShadow)
+                #ifdef USE_SHADOW
+                // determine if surface is facing towards light direction
+                float cosAngle = dot(normalize(normal), -normalize(shadow0.lightDirection));
+                bool facingLight = (cosAngle > 0.01);
+                // convert range [-1, 1] to range [0, 1]
+                // for UV coordinate and depth information
+                vec3 shadowCoord = (shadowPosition0.xyz + 1.0) / 2.0;
+                float closestDistanceToLight = texture(shadow0.depthTextureSampler, shadowCoord.xy).r;
+                float fragmentDistanceToLight = clamp(shadowCoord.z, 0, 1);
+                // determine if fragment lies in shadow of another object
+                bool inShadow = (fragmentDistanceToLight > closestDistanceToLight + shadow0.bias);
+                if (facingLight && inShadow)
                 {
-                    // determine if surface is facing towards light direction
-                    float cosAngle = dot(normalize(normal), -normalize(shadow0.lightDirection));
-                    bool facingLight = (cosAngle > 0.01);
-                    // convert range [-1, 1] to range [0, 1]
-                    // for UV coordinate and depth information
-                    vec3 shadowCoord = (shadowPosition0.xyz + 1.0) / 2.0;
-                    float closestDistanceToLight = texture(shadow0.depthTextureSampler, shadowCoord.xy).r;
-                    float fragmentDistanceToLight = clamp(shadowCoord.z, 0, 1);
-                    // determine if fragment lies in shadow of another object
-                    bool inShadow = (fragmentDistanceToLight > closestDistanceToLight + shadow0.bias);
-                    if (facingLight && inShadow)
-                    {
-                        float s = 1.0 - shadow0.strength;
-                        color *= vec4(s, s, s, 1);
-                    }
-                }               
+                    float s = 1.0 - shadow0.strength;
+                    color *= vec4(s, s, s, 1);
+                }
+                #endif
                 
                 fragColor = color;
             }
@@ -238,11 +243,11 @@ class LambertMaterial(LightedMaterial):
 
     def update_render_settings(self):
         if self.setting_dict["doubleSide"]:
-            GL.glDisable(GL.GL_CULL_FACE)
+            GLState.disable(GL.GL_CULL_FACE)
         else:
-            GL.glEnable(GL.GL_CULL_FACE)
+            GLState.enable(GL.GL_CULL_FACE)
         if self.setting_dict["wireframe"]:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
         else:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
-        GL.glLineWidth(self.setting_dict["lineWidth"])
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
+        GLState.line_width(self.setting_dict["lineWidth"])
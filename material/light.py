@@ -1,4 +1,5 @@
 import OpenGL.GL as GL
+from core.gl_state import GLState
 from material.material import Material
 
 class LightMaterial(Material):
@@ -51,19 +52,19 @@ class LightMaterial(Material):
 
     def update_render_settings(self):
         if self.setting_dict.get("transparent", False):
-            GL.glEnable(GL.GL_BLEND)
-            GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+            GLState.enable(GL.GL_BLEND)
+            GLState.blend_func(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
         else:
-            GL.glDisable(GL.GL_BLEND)
+            GLState.disable(GL.GL_BLEND)
 
         if self.setting_dict["doubleSide"]:
-            GL.glDisable(GL.GL_CULL_FACE)
+            GLState.disable(GL.GL_CULL_FACE)
         else:
-            GL.glEnable(GL.GL_CULL_FACE)
+            GLState.enable(GL.GL_CULL_FACE)
 
         if self.setting_dict["wireframe"]:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_LINE)
         else:
-            GL.glPolygonMode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
+            GLState.polygon_mode(GL.GL_FRONT_AND_BACK, GL.GL_FILL)
 
-        GL.glLineWidth(self.setting_dict["lineWidth"])
\ No newline at end of file
+        GLState.line_width(self.setting_dict["lineWidth"])
\ No newline at end of file
@@ -1,27 +1,186 @@
+import numpy as np
+
+from core.uniform_buffer import UniformBuffer
 from material.material import Material
 
 
 class LightedMaterial(Material):
-    def __init__(self, number_of_light_sources=1):
+    # Camera data and lights are shared by all lighted materials through uniform blocks,
+    # uploaded once per frame by the renderer and read from these binding points
+    CAMERA_BLOCK_BINDING = 0
+    LIGHT_BLOCK_BINDING = 1
+    # Number of lights in the light block
+    MAX_LIGHT_COUNT = 64
+    # Number of lights of the light block that can be applied to one mesh
+    MAX_MESH_LIGHT_COUNT = 16
+    # Size of a Light struct in the light block (std140 layout), in 4-byte values
+    LIGHT_STRIDE = 24
+    # Boolean uniforms that used to switch optional features, and the features that replace them
+    FEATURE_PROPERTY_DICT = {
+        "useTexture": "USE_TEXTURE",
+        "useBumpTexture": "USE_BUMP_TEXTURE",
+        "useShadow": "USE_SHADOW",
+    }
+
+    def __init__(self, number_of_light_sources=1, instanced=False, feature_list=()):
+        if number_of_light_sources > LightedMaterial.MAX_MESH_LIGHT_COUNT:
+            print(f"Lighted materials apply at most {LightedMaterial.MAX_MESH_LIGHT_COUNT} lights to a mesh; "
+                  f"{number_of_light_sources} light sources requested")
+            number_of_light_sources = LightedMaterial.MAX_MESH_LIGHT_COUNT
         self._number_of_light_sources = number_of_light_sources
+        # Instanced materials read a model matrix and a color for each instance
+        # from vertex attributes; only an InstancedMesh can use them
+        self._instanced = instanced
+        # Optional features (such as USE_TEXTURE) enabled with #define in the shaders of inheriting classes;
+        # each set of features compiles to its own program, shared by the materials with the same shaders
+        self._feature_set = frozenset(feature_list)
         # Properties vertex_shader_code and fragment_shader_code
         # will be defined in inherited classes FlatMaterial, LambertMaterial,
         # and PhongMaterial
         super().__init__(self.vertex_shader_code, self.fragment_shader_code)
-        # Add light uniforms to self._uniform_dict
-        for i in range(self._number_of_light_sources):
-            self.add_uniform("Light", f"light{i}", None)
+        # Camera matrices come from the camera block, when the shaders declare it
+        if UniformBuffer.bind_program_block(self.program_ref, "CameraBlock", LightedMaterial.CAMERA_BLOCK_BINDING):
+            del self._uniform_dict["viewMatrix"]
+            del self._uniform_dict["projectionMatrix"]
+        UniformBuffer.bind_program_block(self.program_ref, "LightBlock", LightedMaterial.LIGHT_BLOCK_BINDING)
+        # Lights of the light block applied to the mesh being drawn, set by the renderer for each mesh;
+        # the shaders loop over these, so the number of lights can change without compiling again
+        self.add_uniform("int", "lightCount", 0)
+        self.add_uniform("int[]", "lightIndices", [])
+
+    @property
+    def instanced(self):
+        return self._instanced
+
+    @property
+    def number_of_light_sources(self):
+        """ Largest number of lights applied to a mesh with this material """
+        return self._number_of_light_sources
+
+    def set_lights(self, light_index_list):
+        """ Apply the lights of the light block with these indices, keeping at most number_of_light_sources """
+        light_index_list = light_index_list[:self._number_of_light_sources]
+        self._uniform_dict["lightCount"].data = len(light_index_list)
+        self._uniform_dict["lightIndices"].data = light_index_list
+
+    @property
+    def feature_set(self):
+        return self._feature_set
+
+    def set_properties(self, property_dict):
+        """
+        Set property values. The former feature switches (useTexture, useBumpTexture, useShadow)
+        are still accepted when they match the features the material was created with;
+        features are compiled into the shaders, so they can no longer be switched afterwards
+        """
+        if property_dict:
+            property_dict = dict(property_dict)
+            for name, feature in LightedMaterial.FEATURE_PROPERTY_DICT.items():
+                # Materials that still declare a uniform with that name set it as usual
+                if name not in property_dict or name in self._uniform_dict:
+                    continue
+                if bool(property_dict.pop(name)) != (feature in self._feature_set):
+                    raise Exception(f"Material property {name} is fixed when the material is created; "
+                                    f"create a new material to change it")
+        super().set_properties(property_dict)
+
+    @property
+    def defining_features_in_shader_code(self):
+        """ #define directives of the enabled features, to be placed at the start of a shader code """
+        # Sorted, so that materials with the same features generate the same code
+        return "".join(f"#define {feature}\n" for feature in sorted(self._feature_set))
+
+    @property
+    def declaring_model_matrix_in_shader_code(self):
+        """ Create the declaration of the model matrix (and instance attributes) to be inserted into a vertex shader """
+        if not self._instanced:
+            return "uniform mat4 modelMatrix;"
+        return """uniform mat4 modelMatrix;
+            in mat4 instanceMatrix;
+            in vec3 instanceColor;
+            out vec3 instanceTint;"""
+
+    @property
+    def computing_world_matrix_in_shader_code(self):
+        """ Statements at the start of the vertex shader main() defining worldMatrix, the transform of the vertices """
+        if not self._instanced:
+            return "mat4 worldMatrix = modelMatrix;"
+        return """mat4 worldMatrix = modelMatrix * instanceMatrix;
+                instanceTint = instanceColor;"""
+
+    @property
+    def declaring_instance_color_in_shader_code(self):
+        """ Create the declaration of the instance color to be inserted into a fragment shader """
+        return "in vec3 instanceTint;" if self._instanced else ""
+
+    @property
+    def base_color_in_shader_code(self):
+        """ Expression of the base color in a fragment shader """
+        return "baseColor * instanceTint" if self._instanced else "baseColor"
+
+    @property
+    def uniform_block_extension_in_shader_code(self):
+        """ Directive enabling uniform blocks, to be placed at the start of a shader code """
+        return "\n#extension GL_ARB_uniform_buffer_object : require\n"
+
+    @property
+    def declaring_camera_block_in_shader_code(self):
+        """ Create the declaration of the camera block to be inserted into a shader code """
+        return """
+            layout(std140) uniform CameraBlock
+            {
+                mat4 viewMatrix;
+                mat4 projectionMatrix;
+                vec3 viewPosition;
+            };
+        """
 
     @property
     def declaring_light_uniforms_in_shader_code(self):
-        """ Create a text line with light uniforms to be inserted into a shader code """
-        return "\n" + "\n".join(f"\t\t\tuniform Light light{i};"
-                                for i in range(self._number_of_light_sources)) + "\n"
+        """ Create the declaration of the light block to be inserted into a shader code, after the Light struct """
+        return f"""
+            layout(std140) uniform LightBlock
+            {{
+                Light lights[{LightedMaterial.MAX_LIGHT_COUNT}];
+            }};
+            uniform int lightCount;
+            uniform int lightIndices[{LightedMaterial.MAX_MESH_LIGHT_COUNT}];
+        """
 
     @property
     def adding_lights_in_shader_code(self):
-        return "\n" + "\n".join(f"\t\t\t\tlight += calculateLight(light{i}, position, calcNormal);"
-                                for i in range(self._number_of_light_sources))
+        """ Statements adding the effect of the lights applied to the mesh to the vector light """
+        return """
+                for (int i = 0; i < lightCount; i++)
+                {
+                    light += calculateLight(lights[lightIndices[i]], position, calcNormal);
+                }"""
+
+    @staticmethod
+    def camera_block_data(camera):
+        """ Values of the camera block for a camera, as bytes in std140 layout """
+        data = np.zeros(36, dtype=np.float32)
+        # Matrices are stored column by column
+        data[0:16] = np.asarray(camera.view_matrix, dtype=np.float32).T.ravel()
+        data[16:32] = np.asarray(camera.projection_matrix, dtype=np.float32).T.ravel()
+        data[32:35] = camera.global_position
+        return data.tobytes()
+
+    @staticmethod
+    def light_block_data(light_list):
+        """ Values of the light block for the first MAX_LIGHT_COUNT lights, as bytes in std140 layout """
+        data = np.zeros((LightedMaterial.MAX_LIGHT_COUNT, LightedMaterial.LIGHT_STRIDE), dtype=np.float32)
+        # The light type is an integer; unused entries keep type 0 and add no light
+        light_types = data[:, 0:1].view(np.int32)
+        for i, light in enumerate(light_list[:LightedMaterial.MAX_LIGHT_COUNT]):
+            light_types[i] = light.light_type
+            data[i, 4:7] = light.color
+            data[i, 8:11] = light.direction
+            data[i, 12:15] = light.local_position
+            data[i, 16:19] = light.attenuation
+            data[i, 19] = light.cutoff
+            data[i, 20] = light.inner_cutoff
+        return data.tobytes()
 
     @property
     def vertex_shader_code(self):
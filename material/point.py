@@ -1,5 +1,6 @@
 import OpenGL.GL as GL
 
+from core.gl_state import GLState
 from material.basic import BasicMaterial
 
 
@@ -15,8 +16,8 @@ class PointMaterial(BasicMaterial):
         self.set_properties(property_dict)
 
     def update_render_settings(self):
-        GL.glPointSize(self._setting_dict["pointSize"])
+        GLState.point_size(self._setting_dict["pointSize"])
         if self._setting_dict["roundedPoints"]:
-            GL.glEnable(GL.GL_POINT_SMOOTH)
+            GLState.enable(GL.GL_POINT_SMOOTH)
         else:
-            GL.glDisable(GL.GL_POINT_SMOOTH)
+            GLState.disable(GL.GL_POINT_SMOOTH)
@@ -1,5 +1,6 @@
 import OpenGL.GL as GL
 
+from core.gl_state import GLState
 from material.material import Material
 
 
@@ -72,6 +73,6 @@ class SpriteMaterial(Material):
 
     def update_render_settings(self):
         if self.setting_dict["doubleSide"]:
-            GL.glDisable(GL.GL_CULL_FACE)
+            GLState.disable(GL.GL_CULL_FACE)
         else:
-            GL.glEnable(GL.GL_CULL_FACE)
\ No newline at end of file
+            GLState.enable(GL.GL_CULL_FACE)
\ No newline at end of file
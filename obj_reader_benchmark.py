@@ -0,0 +1,161 @@
+"""
+Compare load times of the NumPy OBJ reader with the original per-line reader
+on every file in objects/, checking that both produce the same vertex data,
+time loading the OBJ files of the bar scene with a cold and a warm cache,
+and report the savings of indexed geometry on the largest assets.
+Run from the repository root: python obj_reader_benchmark.py
+"""
+import collections
+import functools
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+from core.obj_reader import my_obj_reader
+
+
+def legacy_obj_reader(filename):
+    """ Original line-by-line reader, kept as the reference implementation """
+    vertices = []
+    uvs = []
+    normals = []
+    materials = {}
+    current_material = None
+
+    with open(filename, 'r') as in_file:
+        for line in in_file:
+            tokens = line.strip().split()
+            if not tokens:
+                continue
+
+            if tokens[0] == 'v':
+                vertices.append([float(v) for v in tokens[1:]])
+            elif tokens[0] == 'vt':
+                uvs.append([float(v) for v in tokens[1:]])
+            elif tokens[0] == 'vn':
+                normals.append([float(v) for v in tokens[1:]])
+            elif tokens[0] == 'usemtl':
+                current_material = tokens[1]
+                if current_material not in materials:
+                    materials[current_material] = {"positions": [], "uvs": [], "normals": []}
+            elif tokens[0] == 'f':
+                face = [value.split('/') for value in tokens[1:]]
+                for vertex_info in face:
+                    v_idx = int(vertex_info[0]) - 1
+                    t_idx = int(vertex_info[1]) - 1 if len(vertex_info) > 1 and vertex_info[1] else None
+                    n_idx = int(vertex_info[2]) - 1 if len(vertex_info) > 2 and vertex_info[2] else None
+
+                    materials[current_material]["positions"].append(vertices[v_idx])
+                    if t_idx is not None and t_idx < len(uvs):
+                        materials[current_material]["uvs"].append(uvs[t_idx])
+                    else:
+                        materials[current_material]["uvs"].append([0.0, 0.0])
+                    if n_idx is not None and n_idx < len(normals):
+                        materials[current_material]["normals"].append(normals[n_idx])
+                    else:
+                        materials[current_material]["normals"].append([0.0, 0.0, 1.0])
+
+    return [
+        (mat_name, mat_data["positions"], mat_data["uvs"], mat_data["normals"])
+        for mat_name, mat_data in materials.items()
+    ]
+
+
+# OBJ files loaded by world_representation_example.py
+BAR_SCENE_FILES = [
+    "interior", "squaretable", "television", "barstand", "shelf", "barstool",
+    "stage_wireframe", "spotlight", "stage", "puffchair", "table", "lamp",
+    "dancefloor", "neonsign", "exitsign", "jukebox",
+]
+
+
+# Assets compared with and without vertex deduplication
+INDEXED_REPORT_FILES = ["jukebox", "neonsign", "puffchair"]
+# Bytes per vertex of an OBJ geometry: vertexPosition, vertexUV, vertexNormal, faceNormal
+VERTEX_SIZE = (3 + 2 + 3 + 3) * 4
+# Entries of the simulated post-transform vertex cache
+VERTEX_CACHE_SIZE = 32
+
+
+def shader_invocations(indices, cache_size=VERTEX_CACHE_SIZE):
+    """ Vertex shader runs for an indexed draw, simulating a FIFO post-transform cache """
+    cache = collections.deque(maxlen=cache_size)
+    cached = set()
+    invocations = 0
+    for index in indices.tolist():
+        if index not in cached:
+            invocations += 1
+            if len(cache) == cache_size:
+                cached.discard(cache[0])
+            cache.append(index)
+            cached.add(index)
+    return invocations
+
+
+def best_time(function, file_name, repeat):
+    """ Smallest wall-clock time of repeat calls, in milliseconds """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(file_name)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def same_groups(groups_a, groups_b):
+    """ Check that two reader results hold the same names and vertex data """
+    if [group[0] for group in groups_a] != [group[0] for group in groups_b]:
+        return False
+    for group_a, group_b in zip(groups_a, groups_b):
+        for data_a, data_b in zip(group_a[1:], group_b[1:]):
+            if not np.allclose(np.asarray(data_a, dtype=np.float32), np.asarray(data_b, dtype=np.float32)):
+                return False
+    return True
+
+
+def main(repeat=3):
+    total_legacy = 0
+    total_numpy = 0
+    print(f"{'file':<22}{'size (KB)':>10}{'legacy (ms)':>13}{'numpy (ms)':>12}{'speedup':>9}  match")
+    for path in sorted(pathlib.Path("objects").glob("*.obj")):
+        legacy_ms = best_time(legacy_obj_reader, path, repeat)
+        numpy_ms = best_time(functools.partial(my_obj_reader, use_cache=False), path, repeat)
+        total_legacy += legacy_ms
+        total_numpy += numpy_ms
+        match = same_groups(legacy_obj_reader(path), my_obj_reader(path, use_cache=False))
+        print(f"{path.name:<22}{path.stat().st_size / 1024:>10.0f}{legacy_ms:>13.1f}{numpy_ms:>12.1f}"
+              f"{legacy_ms / numpy_ms:>8.1f}x  {match}")
+    print(f"{'total':<32}{total_legacy:>13.1f}{total_numpy:>12.1f}{total_legacy / total_numpy:>8.1f}x")
+
+    paths = [pathlib.Path("objects") / f"{name}.obj" for name in BAR_SCENE_FILES]
+    with tempfile.TemporaryDirectory() as cache_directory:
+        start = time.perf_counter()
+        for path in paths:
+            my_obj_reader(path, cache_directory=cache_directory)
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for path in paths:
+            my_obj_reader(path, cache_directory=cache_directory)
+        warm_ms = (time.perf_counter() - start) * 1000
+        cached_match = all(same_groups(my_obj_reader(path, cache_directory=cache_directory),
+                                       my_obj_reader(path, use_cache=False)) for path in paths)
+    print(f"\nbar scene OBJ loading: cold cache {cold_ms:.1f} ms, warm cache {warm_ms:.1f} ms, match {cached_match}")
+
+    print(f"\n{'file':<14}{'vertices':>10}{'unique':>9}{'VBO (KB)':>10}{'VBO+IBO (KB)':>14}"
+          f"{'VS runs':>10}{'indexed VS runs':>17}")
+    for name in INDEXED_REPORT_FILES:
+        path = pathlib.Path("objects") / f"{name}.obj"
+        groups = my_obj_reader(path, use_cache=False, indexed=True)
+        corners = sum(len(group[4]) for group in groups)
+        unique = sum(len(group[1]) for group in groups)
+        # 16-bit indices are used whenever a group has fewer than 65536 vertices
+        index_bytes = sum(len(group[4]) * (2 if len(group[1]) < 2 ** 16 else 4) for group in groups)
+        invocations = sum(shader_invocations(group[4]) for group in groups)
+        print(f"{path.name:<14}{corners:>10}{unique:>9}{corners * VERTEX_SIZE / 1024:>10.0f}"
+              f"{(unique * VERTEX_SIZE + index_bytes) / 1024:>14.0f}{corners:>10}{invocations:>17}")
+
+
+if __name__ == "__main__":
+    main()
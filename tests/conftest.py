@@ -0,0 +1,43 @@
+import ctypes
+import os
+import sys
+
+import pytest
+
+# The modules of the repository are imported from its root, as the examples do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Without a window, tests that need OpenGL draw into an offscreen EGL surface
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+@pytest.fixture(scope="session")
+def gl_context():
+    """ Current OpenGL 3.3 context on an offscreen surface; the test is skipped if none can be created """
+    try:
+        from OpenGL import EGL
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(display, None, None):
+            pytest.skip("EGL is not available")
+        config_attributes = (EGL.EGLint * 9)(EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                                             EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                             EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_NONE, 0, 0)
+        config = EGL.EGLConfig()
+        config_count = EGL.EGLint()
+        EGL.eglChooseConfig(display, config_attributes, ctypes.pointer(config), 1, ctypes.pointer(config_count))
+        if not config_count.value:
+            pytest.skip("No EGL configuration for OpenGL")
+        surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(
+            EGL.EGL_WIDTH, 64, EGL.EGL_HEIGHT, 64, EGL.EGL_NONE))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT, EGL.EGL_NONE))
+        if not context or not EGL.eglMakeCurrent(display, surface, surface, context):
+            pytest.skip("No OpenGL 3.3 context")
+    except Exception as error:
+        pytest.skip(f"OpenGL is not available: {error}")
+    yield
+    EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+    EGL.eglDestroyContext(display, context)
+    EGL.eglDestroySurface(display, surface)
@@ -0,0 +1,26 @@
+import os
+
+import OpenGL.GL as GL
+
+from core_ext.asset_loader import AssetLoader
+from core_ext.texture_manager import TextureManager
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images", "grid.jpg")
+
+
+def test_each_texture_call_acquires_a_reference(gl_context):
+    assets = AssetLoader(max_workers=1)
+    try:
+        first_texture = assets.texture(IMAGE_PATH)
+        second_texture = assets.texture(IMAGE_PATH)
+    finally:
+        assets.shutdown()
+    assert first_texture is second_texture
+    assert TextureManager.reference_count(IMAGE_PATH) == 2
+    # Releasing one user's reference keeps the texture for the other
+    TextureManager.release(first_texture)
+    TextureManager.evict_unused()
+    assert TextureManager.contains(IMAGE_PATH)
+    assert GL.glIsTexture(second_texture.texture_ref)
+    TextureManager.release(second_texture)
+    TextureManager.evict(IMAGE_PATH)
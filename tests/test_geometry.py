@@ -0,0 +1,29 @@
+import math
+import os
+
+import numpy as np
+
+from core.matrix import Matrix
+from core.obj_reader import my_obj_reader
+from geometry.custom import CustomGeometry
+
+OBJ_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "objects", "table.obj")
+
+
+def test_apply_matrix_rotates_shared_normals_once(gl_context):
+    groups = my_obj_reader(OBJ_PATH, use_cache=False)
+    source_list = [(np.array(positions), np.array(normals)) for _, positions, _, normals in groups]
+    geometry_dict = CustomGeometry(1, 1, 1, groups)
+    rotation_matrix = np.asarray(Matrix.make_rotation_x(math.pi / 2), dtype=float)
+    for geometry in geometry_dict.values():
+        geometry.apply_matrix(rotation_matrix)
+    for geometry, (positions, normals) in zip(geometry_dict.values(), source_list):
+        attribute_dict = geometry.attribute_dict
+        expected_normals = normals @ rotation_matrix[0:3, 0:3].T
+        assert np.allclose(attribute_dict["vertexPosition"].data, positions @ rotation_matrix[0:3, 0:3].T, atol=1e-5)
+        assert np.allclose(attribute_dict["vertexNormal"].data, expected_normals, atol=1e-5)
+        assert np.allclose(attribute_dict["faceNormal"].data, expected_normals, atol=1e-5)
+    # The arrays returned by the reader are left as they were
+    for (_, positions, _, normals), (source_positions, source_normals) in zip(groups, source_list):
+        assert np.array_equal(positions, source_positions)
+        assert np.array_equal(normals, source_normals)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from core.matrix import Matrix
+from core_ext.instanced_mesh import InstancedMesh
+from geometry.box import BoxGeometry
+from material.lambert import LambertMaterial
+
+
+def test_bounding_box_follows_the_geometry(gl_context):
+    geometry = BoxGeometry()
+    mesh = InstancedMesh(geometry, LambertMaterial(instanced=True),
+                         [Matrix.make_translation(0, 0, 0), Matrix.make_translation(4, 0, 0)])
+    center, half_extent = mesh.local_bounding_box
+    assert np.allclose(center, [2, 0, 0])
+    # Moving the vertices of the shared geometry moves every instance
+    geometry.apply_matrix(Matrix.make_translation(0, 10, 0))
+    center, half_extent = mesh.local_bounding_box
+    assert np.allclose(center, [2, 10, 0])
+    assert np.allclose(half_extent, [2.5, 0.5, 0.5])
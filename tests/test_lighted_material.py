@@ -0,0 +1,16 @@
+import pytest
+
+from material.emissive import EmissiveMaterial
+from material.phong import PhongMaterial
+
+
+def test_declared_feature_uniform_is_set(gl_context):
+    material = EmissiveMaterial()
+    material.set_properties({"useTexture": True})
+    assert material.uniform_dict["useTexture"].data is True
+
+
+def test_former_feature_switch_must_match_the_features(gl_context):
+    material = PhongMaterial(property_dict={"useTexture": False, "useShadow": False})
+    with pytest.raises(Exception):
+        material.set_properties({"useTexture": True})
@@ -0,0 +1,47 @@
+import OpenGL.GL as GL
+
+from core_ext.mesh import Mesh
+from core_ext.scene import Scene
+from core_ext.static_batcher import StaticBatcher
+from geometry.box import BoxGeometry
+from material.surface import SurfaceMaterial
+
+
+def _static_box_scene(count):
+    scene = Scene()
+    material = SurfaceMaterial()
+    geometry = BoxGeometry()
+    mesh_list = []
+    for i in range(count):
+        mesh = Mesh(geometry, material)
+        mesh.static = True
+        mesh.set_position([i, 0, 0])
+        scene.add(mesh)
+        mesh_list.append(mesh)
+    return scene, mesh_list
+
+
+def test_unbatch_frees_the_merged_mesh(gl_context):
+    scene, mesh_list = _static_box_scene(4)
+    batcher = StaticBatcher(scene)
+    assert batcher.batch() == 1
+    merged_mesh = batcher.batch_list[0][0]
+    vao_ref = merged_mesh.vao_ref
+    buffer_ref = merged_mesh.geometry.attribute_dict["vertexPosition"].interleaved_buffer.buffer_ref
+    batcher.unbatch()
+    assert not GL.glIsVertexArray(vao_ref)
+    assert not GL.glIsBuffer(buffer_ref)
+    assert all(mesh.visible for mesh in mesh_list)
+    assert merged_mesh not in scene.mesh_list
+
+
+def test_unbatch_ignores_a_mesh_that_is_not_merged(gl_context):
+    scene, mesh_list = _static_box_scene(3)
+    batcher = StaticBatcher(scene)
+    batcher.batch()
+    batch_list = list(batcher.batch_list)
+    other_mesh = Mesh(BoxGeometry(), SurfaceMaterial())
+    other_mesh.static = True
+    batcher.unbatch(other_mesh)
+    assert other_mesh.static
+    assert batcher.batch_list == batch_list
@@ -0,0 +1,26 @@
+import OpenGL.GL as GL
+import numpy as np
+import pygame
+
+from core_ext.texture import Texture
+
+
+def test_colorkey_surface_is_converted():
+    surface = pygame.Surface((4, 2), depth=24)
+    surface.fill((255, 0, 255))
+    surface.set_colorkey((255, 0, 255))
+    # The color key is not in the pixel buffer, so the surface goes through pygame.image.tostring
+    assert Texture._buffer_layout(surface) is None
+    pixel_data = np.frombuffer(pygame.image.tostring(surface, "RGBA", True), dtype=np.uint8).reshape(-1, 4)
+    assert (pixel_data[:, 3] == 0).all()
+
+
+def test_surface_alpha_is_converted():
+    surface = pygame.Surface((4, 2), depth=24)
+    surface.set_alpha(128)
+    assert Texture._buffer_layout(surface) is None
+
+
+def test_plain_surfaces_are_uploaded_from_their_buffer():
+    assert Texture._buffer_layout(pygame.Surface((4, 2), depth=24))[0] == GL.GL_RGB
+    assert Texture._buffer_layout(pygame.Surface((4, 2), pygame.SRCALPHA))[0] == GL.GL_RGBA
@@ -7,12 +7,15 @@ import copy
 
 #core imports
 from core.base import Base
-from core.obj_reader import my_obj_reader
+from core.matrix import Matrix
 #core_ext imports
+from core_ext.asset_loader import AssetLoader
 from core_ext.camera import Camera
+from core_ext.instanced_mesh import InstancedMesh
 from core_ext.mesh import Mesh
 from core_ext.renderer import Renderer
 from core_ext.scene import Scene
+from core_ext.static_batcher import StaticBatcher
 from core_ext.render_target import RenderTarget
 from core_ext.texture import Texture
 #extra imports
@@ -65,6 +68,58 @@ class Example(Base):
 
     def initialize(self):
         print("Initializing program...")
+        # Parse every OBJ file and decode every image in parallel up front;
+        # the scene setup below waits for each asset when it needs it
+        self.assets = AssetLoader()
+        obj_files = [
+            "objects/interior.obj",
+            "objects/squaretable.obj",
+            "objects/television.obj",
+            "objects/barstand.obj",
+            "objects/shelf.obj",
+            "objects/bottle.obj",
+            "objects/barstool.obj",
+            "objects/stage_wireframe.obj",
+            "objects/spotlight.obj",
+            "objects/stage.obj",
+            "objects/puffchair.obj",
+            "objects/table.obj",
+            "objects/lamp.obj",
+            "objects/dancefloor.obj",
+            "objects/neonsign.obj",
+            "objects/exitsign.obj",
+            "objects/jukebox.obj",
+        ]
+        image_files = [
+            "images/brick.jpg",
+            "images/brick-normal-map.png",
+            "images/rubber_tiles.jpg",
+            "images/rubber_tiles_bump.png",
+            "images/tiles.jpg",
+            "images/tiles_bump.png",
+            "images/door_texture.jpg",
+            "images/door_bump.png",
+            "images/darkwood.jpg",
+            "images/TableWood_Normal.jpg",
+            "images/tv_texture.png",
+            "images/sonic-spritesheet.jpg",
+            "images/barstooltexture.png",
+            "images/lightwood.jpg",
+            "images/mirrorball.jpg",
+            "images/mirrorball_normal.jpg",
+            "images/metalmesh.jpg",
+            "images/metalmesh_normal.jpg",
+            "images/selectcoin.jpg",
+            "images/selectsong.jpg",
+            "images/vinyltexture.png",
+            "images/jukebox_label.jpg",
+            "images/Bar Simulator.png",
+        ]
+        for file_name in obj_files:
+            self.assets.request_obj(file_name, indexed=True)
+        for file_name in image_files:
+            self.assets.request_texture(file_name)
+
         self.renderer = Renderer( clear_color=[0,0,0])
         self.scene = Scene()
         self.camera = Camera(aspect_ratio=1920/1080)
@@ -119,31 +174,31 @@ class Example(Base):
         self.light_number = 12
 
         #BarInterior
-        wall_geometry, floor_geometry, roof_geometry, door_geometry = BarGeometry(1, 1, 1, my_obj_reader('objects/interior.obj'))
+        wall_geometry, floor_geometry, roof_geometry, door_geometry = BarGeometry(1, 1, 1, self.assets.obj('objects/interior.obj', indexed=True))
         wall_material = LambertMaterial(
-            texture=Texture("images/brick.jpg"),
-            bump_texture=Texture("images/brick-normal-map.png"),
+            texture=self.assets.texture("images/brick.jpg"),
+            bump_texture=self.assets.texture("images/brick-normal-map.png"),
             property_dict={"bumpStrength": 1},
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         floor_material = PhongMaterial(
-            texture=Texture("images/rubber_tiles.jpg"),
-            bump_texture=Texture("images/rubber_tiles_bump.png"),
+            texture=self.assets.texture("images/rubber_tiles.jpg"),
+            bump_texture=self.assets.texture("images/rubber_tiles_bump.png"),
             property_dict={"bumpStrength": 3},
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         roof_material = LambertMaterial(
-            texture=Texture("images/tiles.jpg"),
-            bump_texture=Texture("images/tiles_bump.png"),
+            texture=self.assets.texture("images/tiles.jpg"),
+            bump_texture=self.assets.texture("images/tiles_bump.png"),
             property_dict={"bumpStrength": 3},
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         door_material = LambertMaterial(
-            texture=Texture("images/door_texture.jpg"),
-            bump_texture=Texture("images/door_bump.png"),
+            texture=self.assets.texture("images/door_texture.jpg"),
+            bump_texture=self.assets.texture("images/door_bump.png"),
             property_dict={"bumpStrength": 3},
             number_of_light_sources=self.light_number,
             use_shadow=True
@@ -160,10 +215,10 @@ class Example(Base):
         ####Meshes#####
 
         #Table
-        table_geometry = CustomGeometry(1,1,1,my_obj_reader("objects/squaretable.obj")).get("table")
+        table_geometry = CustomGeometry(1,1,1,self.assets.obj("objects/squaretable.obj", indexed=True)).get("table")
         table_material = LambertMaterial(
-            texture=Texture("images/darkwood.jpg"),
-            bump_texture=Texture("images/TableWood_Normal.jpg"),
+            texture=self.assets.texture("images/darkwood.jpg"),
+            bump_texture=self.assets.texture("images/TableWood_Normal.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -171,9 +226,9 @@ class Example(Base):
         table.set_position([14,0,-14])
         self.scene.add(table)
         #Sonic
-        tv_geometry = CustomGeometry(1,1,1,my_obj_reader("objects/television.obj")).get("tv")
+        tv_geometry = CustomGeometry(1,1,1,self.assets.obj("objects/television.obj", indexed=True)).get("tv")
         tv_material = PhongMaterial(
-            texture=Texture("images/tv_texture.png"),
+            texture=self.assets.texture("images/tv_texture.png"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -181,7 +236,7 @@ class Example(Base):
         tv.set_position([14,1.1,-14])
         self.scene.add(tv)
         sonic_geometry = RectangleGeometry(0.7,0.7)
-        tile_set = Texture("images/sonic-spritesheet.jpg")
+        tile_set = self.assets.texture("images/sonic-spritesheet.jpg")
         sprite_material = SpriteMaterial(
             tile_set,
             {
@@ -204,22 +259,25 @@ class Example(Base):
         lightcable_material = LambertMaterial(
             property_dict={"baseColor":[0, 0, 0]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
+            use_shadow=True,
+            instanced=True
         )
+        lightcable_matrices = []
         for i in range(5):
-            lightcable = Mesh(geometry=lightcable_geo,material=lightcable_material)
             circlelight = Mesh(geometry=circlelight_geo, material=circlelight_material)
             circlelight.set_position([-9 - i,3.5,12])
-            lightcable.set_position([-9 - i,4.3,12])
+            lightcable_matrices.append(Matrix.make_translation(-9 - i,4.3,12))
             self.scene.add(circlelight)
-            self.scene.add(lightcable)
             self.glowScene.add(circlelight)
+        # All the cables are drawn at once
+        lightcables = InstancedMesh(lightcable_geo, lightcable_material, lightcable_matrices)
+        self.scene.add(lightcables)
         
         #BarStand
-        barstand_geometry = CustomGeometry(1,1,1,my_obj_reader('objects/barstand.obj')).get("barstand")
+        barstand_geometry = CustomGeometry(1,1,1,self.assets.obj('objects/barstand.obj', indexed=True)).get("barstand")
         barstand_material = PhongMaterial(
-            texture=Texture("images/darkwood.jpg"),
-            bump_texture=Texture("images/TableWood_Normal.jpg"),
+            texture=self.assets.texture("images/darkwood.jpg"),
+            bump_texture=self.assets.texture("images/TableWood_Normal.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -228,10 +286,10 @@ class Example(Base):
         barstand.set_position([-10,0,12])
         self.scene.add(barstand)
         #Shelf
-        shelf_geometry = CustomGeometry(1,1,1,my_obj_reader('objects/shelf.obj')).get("shelf")
+        shelf_geometry = CustomGeometry(1,1,1,self.assets.obj('objects/shelf.obj', indexed=True)).get("shelf")
         shelf_material = PhongMaterial(
-            texture=Texture("images/darkwood.jpg"),
-            bump_texture=Texture("images/TableWood_Normal.jpg"),
+            texture=self.assets.texture("images/darkwood.jpg"),
+            bump_texture=self.assets.texture("images/TableWood_Normal.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -240,7 +298,7 @@ class Example(Base):
         shelf.set_position([-11.1,0,14.3])
         self.scene.add(shelf)
         #bottles
-        BeerGeometries = CustomGeometry(1,1,1,my_obj_reader('objects/bottle.obj'))
+        BeerGeometries = CustomGeometry(1,1,1,self.assets.obj('objects/bottle.obj', indexed=True))
         bottle_geo = BeerGeometries.get("outer")
         liquid_geo = BeerGeometries.get("inner")
         cork_geo = BeerGeometries.get("rolha")
@@ -266,6 +324,7 @@ class Example(Base):
                 bottle.set_position([bottle_x,bottle_y,14.5])
                 liquid.local_matrix = bottle.local_matrix
                 cork.local_matrix = bottle.local_matrix
+                cork.static = True
                 self.scene.add(bottle)
                 self.scene.add(liquid)
                 self.scene.add(cork)
@@ -273,9 +332,9 @@ class Example(Base):
             bottle_y += 0.7
             bottle_x = -9.5
         #BarStool 
-        barstool_geometry = CustomGeometry(1,1,1,my_obj_reader('objects/barstool.obj')).get("Material.001")
+        barstool_geometry = CustomGeometry(1,1,1,self.assets.obj('objects/barstool.obj', indexed=True)).get("Material.001")
         barstool_material = PhongMaterial(
-            texture=Texture("images/barstooltexture.png"),
+            texture=self.assets.texture("images/barstooltexture.png"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -283,11 +342,12 @@ class Example(Base):
         for i in range(4):
             barstool = Mesh(geometry=barstool_geometry, material=barstool_material)
             barstool.set_position([-12.5 + x_coord,0,11])
+            barstool.static = True
             self.scene.add(barstool)
             x_coord += 1
         
         #StageWireframe
-        wireframe_geometry = CustomGeometry(1,1,1,my_obj_reader('objects/stage_wireframe.obj')).get("Material")
+        wireframe_geometry = CustomGeometry(1,1,1,self.assets.obj('objects/stage_wireframe.obj', indexed=True)).get("Material")
         wireframe_material = PhongMaterial(
             property_dict={"baseColor":[0.1, 0.1, 0.1]},
             number_of_light_sources=self.light_number,
@@ -298,7 +358,7 @@ class Example(Base):
         self.scene.add(wireframe)
 
         #Spotlight
-        SpotlightGeometries = CustomGeometry(1,1,1,my_obj_reader('objects/spotlight.obj'))
+        SpotlightGeometries = CustomGeometry(1,1,1,self.assets.obj('objects/spotlight.obj', indexed=True))
         support_geo = SpotlightGeometries.get("spotlightsupport")
         spotlight_geo = SpotlightGeometries.get("spotlight")
         light_geo = SpotlightGeometries.get("light")
@@ -320,7 +380,7 @@ class Example(Base):
         self.scene.add(self.light)
 
         #Stage
-        stagegeometries = CustomGeometry(1,1,1,my_obj_reader('objects/stage.obj'))
+        stagegeometries = CustomGeometry(1,1,1,self.assets.obj('objects/stage.obj', indexed=True))
         print(stagegeometries.keys())
         stage_geometry = stagegeometries.get("stage")
         
@@ -329,7 +389,7 @@ class Example(Base):
         cloth_geometry2 = stagegeometries.get("cloth02")
         backstage_geometry = stagegeometries.get("backstage")
         stage_material = PhongMaterial(
-            texture=Texture("images/lightwood.jpg"),
+            texture=self.assets.texture("images/lightwood.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -351,9 +411,11 @@ class Example(Base):
         )
         cloth1 = Mesh(geometry=cloth_geometry1,material=cloth_material)
         cloth1.local_matrix = stage.local_matrix
+        cloth1.static = True
         self.scene.add(cloth1)
         cloth2 = Mesh(geometry=cloth_geometry2,material=cloth_material)
         cloth2.local_matrix = stage.local_matrix
+        cloth2.static = True
         self.scene.add(cloth2)
         backstage_material = PhongMaterial(
             property_dict={"baseColor": [0.8,0.8,0.6]},
@@ -365,54 +427,49 @@ class Example(Base):
         self.scene.add(backstage)
 
         #PuffChair
-        PuffchairGeometries = CustomGeometry(1,1,1,my_obj_reader('objects/puffchair.obj'))
+        PuffchairGeometries = CustomGeometry(1,1,1,self.assets.obj('objects/puffchair.obj', indexed=True))
         cushion_geo = PuffchairGeometries.get("chaircushion")
         chairbase_geo = PuffchairGeometries.get("chairbase")
         cushion_material = LambertMaterial(
             property_dict={"baseColor":[0.2, 0, 0]},
             number_of_light_sources=self.light_number,
-            use_shadow=True,      
+            use_shadow=True,
+            instanced=True
         )
         chairbase_material = PhongMaterial(
             property_dict={"baseColor":[0.05, 0.05, 0.05]},
             number_of_light_sources=self.light_number,
-            use_shadow=True,      
+            use_shadow=True,
+            instanced=True
         )
         # Place 4 chairs around each table
+        chair_matrices = []
         for tx, ty, tz in table_positions:
             for i in range(4):
                 angle_deg = i * 90
                 angle_rad = math.radians(angle_deg)
                 dx = math.sin(angle_rad) * 1.5
                 dz = math.cos(angle_rad) * 1.5
-                cushion = Mesh(geometry=cushion_geo,material=cushion_material)
-                chairbase = Mesh(geometry=chairbase_geo, material=chairbase_material)
-                cushion.set_position([tx + dx, 0, tz + dz])
-                cushion.rotate_y(angle_rad + math.pi)
-                chairbase.local_matrix = cushion.local_matrix
-                self.scene.add(cushion)
-                self.scene.add(chairbase)
+                chair_matrices.append(Matrix.make_translation(tx + dx, 0, tz + dz)
+                                      @ Matrix.make_rotation_y(angle_rad + math.pi))
+        # Every cushion and every chair base is drawn at once
+        cushions = InstancedMesh(cushion_geo, cushion_material, chair_matrices)
+        chairbases = InstancedMesh(chairbase_geo, chairbase_material, chair_matrices)
+        self.scene.add(cushions)
+        self.scene.add(chairbases)
         #RoundTables
-        roundtable_geometry = CustomGeometry(1,1,1,my_obj_reader('objects/table.obj')).get("table")
+        roundtable_geometry = CustomGeometry(1,1,1,self.assets.obj('objects/table.obj', indexed=True)).get("table")
         roundtable_material = LambertMaterial(
             property_dict={"baseColor":[0.3, 0.2, 0]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
+            use_shadow=True,
+            instanced=True
         )
-        roundtable1 = Mesh(geometry=roundtable_geometry,material=roundtable_material)
-        roundtable1.set_position(table_positions[0])
-        roundtable2 = Mesh(geometry=roundtable_geometry,material=roundtable_material)
-        roundtable2.set_position(table_positions[1])
-        roundtable3 = Mesh(geometry=roundtable_geometry,material=roundtable_material)
-        roundtable3.set_position(table_positions[2])
-        roundtable4 = Mesh(geometry=roundtable_geometry,material=roundtable_material)
-        roundtable4.set_position(table_positions[3])
-        self.scene.add(roundtable1)
-        self.scene.add(roundtable2)
-        self.scene.add(roundtable3)
-        self.scene.add(roundtable4)
+        table_matrices = [Matrix.make_translation(*position) for position in table_positions]
+        roundtables = InstancedMesh(roundtable_geometry, roundtable_material, table_matrices)
+        self.scene.add(roundtables)
         #lamps
-        LampGeometries = CustomGeometry(1,1,1,my_obj_reader('objects/lamp.obj'))
+        LampGeometries = CustomGeometry(1,1,1,self.assets.obj('objects/lamp.obj', indexed=True))
         base_geometry = LampGeometries.get("base")
         lamp_geometry= LampGeometries.get("lamp")
         lampshade_geometry= LampGeometries.get("lampshade")
@@ -420,37 +477,34 @@ class Example(Base):
         base_material = PhongMaterial(
             property_dict={"baseColor":[1.0, 0.8, 0.0]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
+            use_shadow=True,
+            instanced=True
         )
         lamp_material = PhongMaterial(
             property_dict={"baseColor":[1.0, 1.0, 0.8]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
+            use_shadow=True,
+            instanced=True
         )
         lampshade_material = PhongMaterial(
             property_dict={"baseColor":[0.3, 0.8, 0.4]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
+            use_shadow=True,
+            instanced=True
         )
         switch_material  = PhongMaterial(
             property_dict={"baseColor":[0.1, 0.1, 0]},
             number_of_light_sources=self.light_number,
-            use_shadow=True
-        )
-        for i in range(4):
-            base = Mesh(geometry=base_geometry,material=base_material)
-            lamp = Mesh(geometry=lamp_geometry,material=lamp_material)
-            lampshade = Mesh(geometry=lampshade_geometry,material=lampshade_material)
-            switch = Mesh(geometry=switch_geometry,material=switch_material)
-            pos = table_positions[i] + np.array([0,0.9,0])
-            base.set_position(pos)
-            lamp.local_matrix = base.local_matrix
-            lampshade.local_matrix = base.local_matrix
-            switch.local_matrix = base.local_matrix
-            self.scene.add(base)
-            self.scene.add(lamp)
-            self.scene.add(lampshade)
-            self.scene.add(switch)
+            use_shadow=True,
+            instanced=True
+        )
+        # Each part of the 4 lamps is drawn at once
+        lamp_matrices = [Matrix.make_translation(*(table_positions[i] + np.array([0,0.9,0]))) for i in range(4)]
+        for part_geometry, part_material in [(base_geometry, base_material),
+                                             (lamp_geometry, lamp_material),
+                                             (lampshade_geometry, lampshade_material),
+                                             (switch_geometry, switch_material)]:
+            self.scene.add(InstancedMesh(part_geometry, part_material, lamp_matrices))
         #mirrorball
         cable_geometry = CylinderGeometry(radius=0.02,height=1)
         cable_material  = PhongMaterial(
@@ -463,8 +517,8 @@ class Example(Base):
         self.scene.add(cable)
         mirrorball_geometry = SphereGeometry(radius=0.5)
         mirrorball_material = PhongMaterial(
-            texture=Texture("images/mirrorball.jpg"),
-            bump_texture=Texture("images/mirrorball_normal.jpg"),
+            texture=self.assets.texture("images/mirrorball.jpg"),
+            bump_texture=self.assets.texture("images/mirrorball_normal.jpg"),
             property_dict={"bumpStrength": 10},
             number_of_light_sources=self.light_number,
             use_shadow=True
@@ -480,7 +534,7 @@ class Example(Base):
         lightcone.set_direction([0,-1,1])
         self.scene.add(lightcone)
         #DanceFloor
-        DancefloorGeometries = CustomGeometry(1,1,1,my_obj_reader('objects/dancefloor.obj'))
+        DancefloorGeometries = CustomGeometry(1,1,1,self.assets.obj('objects/dancefloor.obj', indexed=True))
         color1_geo = DancefloorGeometries.get("color1")
         color2_geo = DancefloorGeometries.get("color2")
         color1_material = SurfaceMaterial(property_dict={"baseColor": [0.6,0,0.6]})
@@ -493,7 +547,7 @@ class Example(Base):
         self.scene.add(self.dancefloor_color2)
 
         #NeonSign
-        NeonsignGeometries = CustomGeometry(1, 1, 1, my_obj_reader('objects/neonsign.obj'))
+        NeonsignGeometries = CustomGeometry(1, 1, 1, self.assets.obj('objects/neonsign.obj', indexed=True))
         blue_geo = NeonsignGeometries.get("BlueText")
         yellow_geo = NeonsignGeometries.get("YellowText")
         black_geo = NeonsignGeometries.get("BlackText")
@@ -513,7 +567,7 @@ class Example(Base):
         self.scene.add(blackSign)
 
         #ExitSign
-        exit_geo = CustomGeometry(1,1,1,my_obj_reader('objects/exitsign.obj')).get("text")
+        exit_geo = CustomGeometry(1,1,1,self.assets.obj('objects/exitsign.obj', indexed=True)).get("text")
         exit_material = SurfaceMaterial(property_dict={"baseColor": [0.0, 1.0, 0]})
         exitsign = Mesh(geometry=exit_geo,material=exit_material)
         exitsign.rotate_y(math.radians(180))
@@ -521,7 +575,7 @@ class Example(Base):
         self.scene.add(exitsign)
 
         #Jukebox
-        wood_geo, neon_geo, metal_geo, red_geo, metalmesh_geo, selectcoin_geo, selectsong_geo, vinyl_geo, songs1_geo, songs2_geo, glass_geo = JukeboxGeometry(1,1,1,my_obj_reader('objects/jukebox.obj'))
+        wood_geo, neon_geo, metal_geo, red_geo, metalmesh_geo, selectcoin_geo, selectsong_geo, vinyl_geo, songs1_geo, songs2_geo, glass_geo = JukeboxGeometry(1,1,1,self.assets.obj('objects/jukebox.obj', indexed=True))
         wood_material = LambertMaterial(
             property_dict={"baseColor":[0.2, 0.1, 0]},
             number_of_light_sources=self.light_number,
@@ -541,29 +595,29 @@ class Example(Base):
             use_shadow=True
         )
         metalmesh_material = PhongMaterial(
-            texture=Texture("images/metalmesh.jpg"),
-            bump_texture=Texture("images/metalmesh_normal.jpg"),
+            texture=self.assets.texture("images/metalmesh.jpg"),
+            bump_texture=self.assets.texture("images/metalmesh_normal.jpg"),
             property_dict={"bumpStrength": 3},
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         selectcoin_material = PhongMaterial(
-            texture=Texture("images/selectcoin.jpg"),
+            texture=self.assets.texture("images/selectcoin.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         selectsong_material = PhongMaterial(
-            texture=Texture("images/selectsong.jpg"),
+            texture=self.assets.texture("images/selectsong.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         vinyl_material = PhongMaterial(
-            texture=Texture("images/vinyltexture.png"),
+            texture=self.assets.texture("images/vinyltexture.png"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
         songlist_material = LambertMaterial(
-            texture=Texture("images/jukebox_label.jpg"),
+            texture=self.assets.texture("images/jukebox_label.jpg"),
             number_of_light_sources=self.light_number,
             use_shadow=True
         )
@@ -665,9 +719,16 @@ class Example(Base):
         self.hudCamera = Camera()
         self.hudCamera.set_orthographic(0,800,0,600,1,-1)
         labelGeo1 = RectangleGeometry(width=600,height=80,position=[0,600],alignment=[0,1])
-        labelMat1 = TextureMaterial (Texture("images/Bar Simulator.png"))
+        labelMat1 = TextureMaterial (self.assets.texture("images/Bar Simulator.png"))
         label1 = Mesh(labelGeo1,labelMat1)
         self.hudScene.add(label1)
+
+        # Merge the static meshes sharing a material, drawing each group at once
+        self.static_batcher = StaticBatcher(self.scene)
+        self.static_batcher.batch()
+
+        # Every asset has been loaded; stop the worker processes
+        self.assets.shutdown()
         
 
 
@@ -764,4 +825,6 @@ class Example(Base):
         ]
 
 # Instantiate this class and run the program
-Example(screen_size=[1920, 1080]).run()
+# (guarded, since the asset loader workers import this module again)
+if __name__ == "__main__":
+    Example(screen_size=[1920, 1080]).run()